@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from app.db import (POOL_MAX_SIZE, POOL_MIN_SIZE, POOL_TIMEOUT,
+                    PoolTimeoutError, raw_dsn)
+
+_pool = None
+# Mismas métricas de espera que ConnectionPool (app/db.py) para el pool de la API
+_stats = {
+    "checkouts": 0,
+    "timeouts": 0,
+    "in_use": 0,
+    "wait_total_ms": 0.0,
+    "wait_max_ms": 0.0,
+}
+
+
+async def _init_connection(conn):
+    # psycopg2 devuelve json/jsonb ya decodificado; se replica aquí
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(
+            typename, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+        )
+
+
+async def open_pool():
+    """Crea el pool asíncrono (se llama en el arranque de la app)."""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            dsn=raw_dsn,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            init=_init_connection,
+            max_inactive_connection_lifetime=float(
+                os.getenv("DB_POOL_MAX_IDLE", "300")
+            ),
+        )
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def acquire():
+    """Presta una conexión del pool midiendo la espera; PoolTimeoutError si no llega a tiempo."""
+    pool = await open_pool()
+    started = time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise PoolTimeoutError(
+            f"No hay conexiones disponibles tras {POOL_TIMEOUT}s de espera"
+        )
+    waited_ms = (time.perf_counter() - started) * 1000
+    _stats["checkouts"] += 1
+    _stats["in_use"] += 1
+    _stats["wait_total_ms"] += waited_ms
+    _stats["wait_max_ms"] = max(_stats["wait_max_ms"], waited_ms)
+    try:
+        yield conn
+    finally:
+        _stats["in_use"] -= 1
+        await pool.release(conn)
+
+
+async def get_async_db():
+    """Dependencia de FastAPI: una conexión asyncpg por petición."""
+    async with acquire() as conn:
+        yield conn
+
+
+async def fetch_one(conn, query, *args):
+    """Devuelve la primera fila como tupla, o None."""
+    row = await conn.fetchrow(query, *args)
+    return tuple(row) if row is not None else None
+
+
+async def fetch_value(conn, query, *args):
+    return await conn.fetchval(query, *args)
+
+
+async def execute(conn, query, *args):
+    return await conn.execute(query, *args)
+
+
+def get_async_pool_stats():
+    if _pool is None:
+        return {"open": False}
+    stats = dict(_stats)
+    checkouts = stats["checkouts"] or 1
+    return {
+        **stats,
+        "wait_avg_ms": round(stats["wait_total_ms"] / checkouts, 3),
+        "wait_total_ms": round(stats["wait_total_ms"], 3),
+        "wait_max_ms": round(stats["wait_max_ms"], 3),
+        "open": True,
+        "size": _pool.get_size(),
+        "idle": _pool.get_idle_size(),
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+    }
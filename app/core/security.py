@@ -1,8 +1,17 @@
+import hashlib
+import hmac
 import os
+import time
 
 from fastapi import Header, HTTPException, status
 
 API_KEY = os.getenv("API_KEY")
+# Firma de los tokens de sesión que emite /auth/verify-voice
+SESSION_SECRET = os.getenv("SESSION_SECRET") or API_KEY
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", str(60 * 60 * 24 * 2)))
+
+if not SESSION_SECRET:
+    print("⚠️ SESSION_SECRET y API_KEY vacías: no se emiten tokens y /ws/chat rechaza las conexiones")
 
 
 def verify_api_key(x_api_key: str = Header(...)):
@@ -10,3 +19,31 @@ def verify_api_key(x_api_key: str = Header(...)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
         )
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(SESSION_SECRET.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def create_session_token(user_id, ttl=SESSION_TOKEN_TTL) -> str:
+    """Token "<user_id>.<expira>.<firma>" ligado a un usuario."""
+    if not SESSION_SECRET:
+        raise RuntimeError("SESSION_SECRET (o API_KEY) no está definida")
+    payload = f"{user_id}.{int(time.time()) + ttl}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_session_token(token, user_id) -> bool:
+    """True si el token es válido, no ha expirado y pertenece a `user_id`."""
+    if not SESSION_SECRET or not token:
+        return False
+    try:
+        token_user, expires, signature = token.split(".")
+        expired = int(expires) < time.time()
+    except ValueError:
+        return False
+    return (
+        hmac.compare_digest(signature, _sign(f"{token_user}.{expires}"))
+        and not expired
+        and token_user == str(user_id)
+    )
@@ -1,8 +1,12 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
 from urllib.parse import urlparse
 
 import psycopg2
 from dotenv import load_dotenv
+from psycopg2 import pool as pg_pool
 
 load_dotenv()
 
@@ -14,16 +18,152 @@ if not raw_dsn:
 # Parsear la URL
 result = urlparse(raw_dsn)
 
-conn = psycopg2.connect(
-    dbname=result.path[1:],  # eliminar la /
-    user=result.username,
-    password=result.password,
-    host=result.hostname,
-    port=result.port,
+CONNECTION_PARAMS = {
+    "dbname": result.path[1:],  # eliminar la /
+    "user": result.username,
+    "password": result.password,
+    "host": result.hostname,
+    "port": result.port,
+}
+
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+
+class PoolTimeoutError(Exception):
+    """No se liberó ninguna conexión del pool dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones psycopg2 con espera acotada, verificación de salud
+    y métricas de espera.
+
+    ThreadedConnectionPool lanza un error en cuanto se agotan las conexiones;
+    aquí un semáforo hace que las peticiones esperen su turno hasta `timeout`.
+    """
+
+    def __init__(self, minconn, maxconn, timeout, **params):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self._params = params
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "reconnects": 0,
+            "in_use": 0,
+            "wait_total_ms": 0.0,
+            "wait_max_ms": 0.0,
+        }
+
+    def _get_pool(self):
+        # El pool se crea en el primer uso para no bloquear el import de la app
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pg_pool.ThreadedConnectionPool(
+                        self.minconn, self.maxconn, **self._params
+                    )
+        return self._pool
+
+    @staticmethod
+    def _is_healthy(conn):
+        if conn.closed:
+            return False
+        try:
+            # En autocommit antes del SELECT 1: si no, abre una transacción y
+            # el cambio posterior de autocommit falla
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeoutError(
+                f"No hay conexiones disponibles tras {self.timeout}s de espera"
+            )
+        waited_ms = (time.perf_counter() - started) * 1000
+
+        conn = None
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+            if not self._is_healthy(conn):
+                # Conexión caída: se descarta y se abre una nueva
+                pool.putconn(conn, close=True)
+                conn = None
+                conn = pool.getconn()
+                with self._lock:
+                    self._stats["reconnects"] += 1
+            conn.autocommit = True
+        except Exception:
+            # La conexión que falló se cierra y vuelve al pool para no agotarlo
+            if conn is not None:
+                try:
+                    pool.putconn(conn, close=True)
+                except Exception:
+                    pass
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["wait_total_ms"] += waited_ms
+            self._stats["wait_max_ms"] = max(self._stats["wait_max_ms"], waited_ms)
+        return conn
+
+    def putconn(self, conn):
+        try:
+            self._get_pool().putconn(conn, close=bool(conn.closed))
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        checkouts = stats["checkouts"] or 1
+        stats["wait_avg_ms"] = round(stats["wait_total_ms"] / checkouts, 3)
+        stats["wait_total_ms"] = round(stats["wait_total_ms"], 3)
+        stats["wait_max_ms"] = round(stats["wait_max_ms"], 3)
+        stats["min_size"] = self.minconn
+        stats["max_size"] = self.maxconn
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+
+db_pool = ConnectionPool(
+    POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_TIMEOUT, **CONNECTION_PARAMS
 )
 
-conn.autocommit = True
+
+@contextmanager
+def connection():
+    """Presta una conexión del pool y la devuelve al terminar."""
+    conn = db_pool.getconn()
+    try:
+        yield conn
+    finally:
+        db_pool.putconn(conn)
 
 
-def get_cursor():
-    return conn.cursor()
+def get_pool_stats():
+    return db_pool.stats()
@@ -1,10 +1,44 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.routes import auth_routes, context_routes, report_routes, user_routes
+from app.async_db import close_pool, open_pool
+from app.db import db_pool
+from app.routes import (
+    auth_routes,
+    chat_routes,
+    context_routes,
+    health_routes,
+    report_routes,
+    transcription_routes,
+    user_routes,
+)
+from app.utils.report_jobs import ensure_schema
+from app.workers.report_worker import start_inprocess_workers, stop_inprocess_workers
+from chatbot.core.whisper_models import whisper_models
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_pool()
+    ensure_schema()
+    start_inprocess_workers()
+    # Opcional: precargar Whisper en segundo plano sin retrasar el arranque
+    if os.getenv("WHISPER_WARM_UP", "0") == "1":
+        whisper_models.warm_up()
+    yield
+    stop_inprocess_workers()
+    await close_pool()
+    db_pool.close()
+
 
-app = FastAPI(title="Voice Auth App")
+app = FastAPI(title="Voice Auth App", lifespan=lifespan)
 
 app.include_router(user_routes.router, tags=["Users"])
 app.include_router(auth_routes.router, tags=["Auth"])
 app.include_router(context_routes.router, tags=["Context"])
 app.include_router(report_routes.router, tags=["Reports"])
+app.include_router(chat_routes.router, tags=["Chat"])
+app.include_router(transcription_routes.router, tags=["Transcription"])
+app.include_router(health_routes.router, tags=["Health"])
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from app.db import get_cursor
+from app.async_db import fetch_one, get_async_db
+from app.core.security import SESSION_SECRET, create_session_token
 from app.utils.whisper_utils import record_and_transcribe
 
 router = APIRouter()
@@ -15,17 +17,15 @@ class VoiceAuthRequest(BaseModel):
 
 
 @router.post("/auth/verify-voice")
-def verify_voice(body: VoiceAuthRequest):
-    cur = get_cursor()
-
-    # Si no se pasa voice_code, usar Whisper
-    voice_code = body.voice_code or record_and_transcribe()
-
-    cur.execute(
-        "SELECT id, factor1, factor2, factor3, active FROM users WHERE voice_code = %s",
-        (voice_code,),
+async def verify_voice(body: VoiceAuthRequest, conn=Depends(get_async_db)):
+    # Si no se pasa voice_code, usar Whisper (bloqueante, fuera del event loop)
+    voice_code = body.voice_code or await run_in_threadpool(record_and_transcribe)
+
+    row = await fetch_one(
+        conn,
+        "SELECT id, factor1, factor2, factor3, active FROM users WHERE voice_code = $1",
+        voice_code,
     )
-    row = cur.fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
@@ -38,11 +38,15 @@ def verify_voice(body: VoiceAuthRequest):
         raise HTTPException(status_code=401, detail="Factores incorrectos")
 
     # Cargar contexto
-    cur.execute(
-        "SELECT structured_context, encrypted FROM user_contexts WHERE user_id = %s",
-        (user_id,),
+    context_row = await fetch_one(
+        conn,
+        "SELECT structured_context, encrypted FROM user_contexts WHERE user_id = $1",
+        user_id,
     )
-    context_row = cur.fetchone()
     context = context_row[0] if context_row else {}
 
-    return {"message": "Autenticación exitosa", "user_id": user_id, "context": context}
+    response = {"message": "Autenticación exitosa", "user_id": user_id, "context": context}
+    # Necesario para abrir /ws/chat/{user_id}; sin secreto configurado el chat queda cerrado
+    if SESSION_SECRET:
+        response["session_token"] = create_session_token(user_id)
+    return response
@@ -0,0 +1,175 @@
+import asyncio
+import importlib
+import json
+import time
+from collections import deque
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+
+from app.async_db import acquire, execute, fetch_one
+from app.core.security import verify_session_token
+from app.utils.encryption import decrypt_context, encrypt_context
+from app.utils.report_cache import report_cache
+
+router = APIRouter()
+
+USER_CHAT_QUERY = "SELECT name, context, encrypted FROM users WHERE id = $1"
+UPDATE_CONTEXT_QUERY = "UPDATE users SET context = $1, updated_at = now() WHERE id = $2"
+
+_chat_chain = None
+_active_sessions = 0
+_turns = 0
+_ttft_ms = deque(maxlen=500)
+
+
+async def _load_chat_chain():
+    # El chatbot (Gemini, retriever, embeddings) se importa al abrir el primer
+    # chat: la app arranca igual aunque no haya GEMINI_API_KEY ni base vectorial
+    global _chat_chain
+    if _chat_chain is None:
+        _chat_chain = await run_in_threadpool(
+            importlib.import_module, "chatbot.core.chat_chain"
+        )
+    return _chat_chain
+
+
+async def _load_user(user_id):
+    # Una conexión por operación: el socket puede durar minutos y no debe ocupar el pool
+    async with acquire() as conn:
+        row = await fetch_one(conn, USER_CHAT_QUERY, user_id)
+    if not row:
+        return None
+    name, context, encrypted = row
+    if context and encrypted:
+        context = decrypt_context(context)
+    return {"name": name, "context": context or {}, "encrypted": bool(encrypted)}
+
+
+async def _save_context(user_id, context, encrypted):
+    stored = encrypt_context(context) if encrypted else context
+    async with acquire() as conn:
+        await execute(conn, UPDATE_CONTEXT_QUERY, stored, user_id)
+    # Igual que UserRepository.update: el informe cacheado queda obsoleto
+    report_cache.invalidate_user(user_id)
+
+
+def _parse_message(raw):
+    """Acepta texto plano o {"message": "..."}."""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return raw.strip()
+    if isinstance(data, dict):
+        return str(data.get("message", "")).strip()
+    return raw.strip()
+
+
+def _session_token(websocket):
+    """Token de sesión en `?token=` o en la cabecera `Authorization: Bearer`."""
+    token = websocket.query_params.get("token")
+    if token:
+        return token
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    return credentials if scheme.lower() == "bearer" else None
+
+
+def get_chat_stats():
+    ttft = sorted(_ttft_ms)
+
+    def percentile(p):
+        return round(ttft[min(len(ttft) - 1, int(p * len(ttft)))], 1) if ttft else None
+
+    return {
+        "active_sessions": _active_sessions,
+        "turns": _turns,
+        "ttft_ms_p50": percentile(0.5),
+        "ttft_ms_p95": percentile(0.95),
+        # None hasta que se abre el primer chat (el chatbot se carga entonces)
+        "caches": _chat_chain.get_cache_stats() if _chat_chain else None,
+    }
+
+
+@router.websocket("/ws/chat/{user_id}")
+async def chat_socket(websocket: WebSocket, user_id: int):
+    """
+    Chat con streaming de tokens. Requiere el `session_token` de
+    /auth/verify-voice del mismo usuario. Por cada mensaje del cliente se envían:
+
+        {"type": "token", "text": ...}             (varios)
+        {"type": "done", "answer": ..., "ttft_ms": ..., "total_ms": ...}
+        {"type": "context", "saved": true|false}
+    """
+    global _active_sessions, _turns
+
+    # Antes de aceptar: sin token válido el cliente recibe un 403
+    if not verify_session_token(_session_token(websocket), user_id):
+        await websocket.close(code=1008, reason="Sesión no válida")
+        return
+
+    await websocket.accept()
+    user = await _load_user(user_id)
+    if user is None:
+        await websocket.close(code=4404, reason="Usuario no encontrado")
+        return
+
+    chat_chain = await _load_chat_chain()
+    user_context = user["context"]
+    await websocket.send_json({"type": "ready", "name": user["name"]})
+
+    _active_sessions += 1
+    try:
+        while True:
+            user_input = _parse_message(await websocket.receive_text())
+            if not user_input:
+                continue
+
+            started = time.perf_counter()
+            # La extracción de contexto corre en paralelo a la respuesta
+            extraction = asyncio.create_task(
+                chat_chain.aextract_context(user_input.lower(), user_context)
+            )
+
+            parts = []
+            ttft = None
+            try:
+                async for token in chat_chain.astream_answer(user_input.lower(), user_context):
+                    if ttft is None:
+                        ttft = (time.perf_counter() - started) * 1000
+                        _ttft_ms.append(ttft)
+                    parts.append(token)
+                    await websocket.send_json({"type": "token", "text": token})
+            except WebSocketDisconnect:
+                extraction.cancel()
+                raise
+            except Exception as e:
+                extraction.cancel()
+                print(f"❌ Error con Gemini en el chat de {user_id}: {e}")
+                await websocket.send_json(
+                    {"type": "error", "detail": "Lo siento, tuve un problema para responder."}
+                )
+                continue
+
+            _turns += 1
+            await websocket.send_json(
+                {
+                    "type": "done",
+                    "answer": "".join(parts),
+                    "ttft_ms": round(ttft, 1) if ttft is not None else None,
+                    "total_ms": round((time.perf_counter() - started) * 1000, 1),
+                }
+            )
+
+            # El siguiente turno usa el contexto nuevo; si falla se mantiene el anterior
+            try:
+                user_context = await extraction
+                await _save_context(user_id, user_context, user["encrypted"])
+                saved = True
+            except Exception as e:
+                print(f"⚠️ No se pudo actualizar el contexto de {user_id}: {e}")
+                saved = False
+            await websocket.send_json({"type": "context", "saved": saved})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _active_sessions -= 1
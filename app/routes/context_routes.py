@@ -1,19 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
-from app.db import get_cursor
+from app.async_db import fetch_one, get_async_db
 from app.utils.encryption import decrypt_context
 
 router = APIRouter()
 
 
 @router.get("/users/{user_id}/context")
-def get_user_context(user_id: int):
-    cur = get_cursor()
-    cur.execute(
-        "SELECT structured_context, encrypted FROM user_contexts WHERE user_id = %s",
-        (user_id,),
+async def get_user_context(user_id: int, conn=Depends(get_async_db)):
+    row = await fetch_one(
+        conn,
+        "SELECT structured_context, encrypted FROM user_contexts WHERE user_id = $1",
+        user_id,
     )
-    row = cur.fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Contexto no encontrado")
     data, encrypted = row
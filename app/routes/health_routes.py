@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+
+from app.async_db import get_async_pool_stats
+from app.db import get_pool_stats
+from app.routes.chat_routes import get_chat_stats
+from app.utils.report_cache import report_cache
+from app.utils.report_generator import report_flight
+from app.utils.transcription_batcher import transcription_batcher
+from chatbot.core.gemini_service import llm_flight
+from chatbot.core.whisper_engine import get_preprocess_stats
+from chatbot.core.whisper_models import whisper_models
+
+router = APIRouter()
+
+
+@router.get("/health/db")
+def db_health():
+    """Métricas de los pools de conexiones (esperas, reconexiones, conexiones en uso)."""
+    return {"pool": get_pool_stats(), "async_pool": get_async_pool_stats()}
+
+
+@router.get("/health/cache")
+def cache_health():
+    return {
+        "reports": report_cache.stats(),
+        "single_flight": report_flight.stats(),
+        "llm_single_flight": llm_flight.stats(),
+    }
+
+
+@router.get("/health/chat")
+def chat_health():
+    """Sesiones de chat abiertas y tiempo hasta el primer token (ms)."""
+    return get_chat_stats()
+
+
+@router.get("/health/whisper")
+def whisper_health():
+    """Modelos Whisper cargados, tiempo de carga, memoria, micro-batching y preprocesado."""
+    return {
+        **whisper_models.stats(),
+        "batcher": transcription_batcher.stats(),
+        "preprocess": get_preprocess_stats(),
+    }
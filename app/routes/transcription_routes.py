@@ -0,0 +1,139 @@
+import io
+import time
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+
+from app.utils.transcription_batcher import transcription_batcher
+from chatbot.core.audio_capture import SAMPLE_RATE, decode_pcm16, read_wav
+from chatbot.core.voice_code import recognize_code
+from chatbot.core.whisper_engine import preprocess_audio
+
+router = APIRouter()
+
+# Whisper decodifica segmentos de 30 s; lo que exceda se recortaría
+MAX_AUDIO_SECONDS = 30
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+
+def decode_upload(data: bytes, sample_rate: int):
+    """
+    WAV (cabecera RIFF) o PCM 16 bits mono a `sample_rate` -> (float32 a 16 kHz
+    preprocesado, duraciones antes y después de recortar el silencio).
+    """
+    try:
+        if data[:4] == b"RIFF":
+            audio = read_wav(io.BytesIO(data), SAMPLE_RATE)
+        else:
+            audio = decode_pcm16(data, sample_rate, SAMPLE_RATE)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Audio no válido: {e}")
+
+    if len(audio) == 0:
+        raise HTTPException(status_code=400, detail="Audio vacío")
+    if len(audio) > MAX_AUDIO_SECONDS * SAMPLE_RATE:
+        raise HTTPException(
+            status_code=413, detail=f"El audio supera {MAX_AUDIO_SECONDS} segundos"
+        )
+    return preprocess_audio(audio)
+
+
+async def read_upload(request: Request) -> bytes:
+    """Lee el cuerpo por trozos y corta en cuanto supera MAX_UPLOAD_BYTES."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Archivo demasiado grande")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Archivo demasiado grande")
+    return bytes(body)
+
+
+@router.post("/transcribe")
+async def transcribe_upload(request: Request, sample_rate: int = SAMPLE_RATE):
+    """
+    Transcribe el audio enviado en el cuerpo: un WAV, o PCM 16 bits mono
+    (`application/octet-stream`) con su `sample_rate` en la query.
+    """
+    started = time.perf_counter()
+    body = await read_upload(request)
+    # Decodificar y preprocesar es CPU: fuera del event loop
+    audio, info = await run_in_threadpool(decode_upload, body, sample_rate)
+
+    # Solo silencio: no hace falta pasar por Whisper
+    text = await transcription_batcher.transcribe(audio) if len(audio) else ""
+    return {
+        "text": text,
+        "duration_s": info["input_s"],
+        "trimmed_s": info["output_s"],
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+@router.post("/transcribe/code")
+async def transcribe_voice_code(request: Request, sample_rate: int = SAMPLE_RATE):
+    """
+    Reconoce un código de voz de 4 dígitos (mismo formato de audio que
+    /transcribe). El resultado se usa como `voice_code` en /auth/verify-voice.
+    """
+    started = time.perf_counter()
+    body = await read_upload(request)
+    audio, _ = await run_in_threadpool(decode_upload, body, sample_rate)
+
+    code, path = await run_in_threadpool(recognize_code, audio) if len(audio) else (None, None)
+    if code is None:
+        raise HTTPException(status_code=422, detail="No se reconoció un código de 4 dígitos")
+    return {
+        "voice_code": code,
+        "path": path,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+@router.websocket("/ws/transcribe")
+async def transcribe_socket(websocket: WebSocket, sample_rate: int = SAMPLE_RATE):
+    """
+    El cliente envía el audio en mensajes binarios (PCM 16 bits mono, o un WAV
+    troceado) y el texto "end" al terminar cada frase; se responde
+    {"type": "transcript", "text": ...} y se puede enviar la siguiente.
+    """
+    await websocket.accept()
+    buffer = bytearray()
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes"):
+                buffer.extend(message["bytes"])
+                if len(buffer) > MAX_UPLOAD_BYTES:
+                    await websocket.close(code=1009, reason="Audio demasiado grande")
+                    return
+                continue
+
+            if (message.get("text") or "").strip().lower() != "end":
+                continue
+
+            started = time.perf_counter()
+            try:
+                audio, info = await run_in_threadpool(decode_upload, bytes(buffer), sample_rate)
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "detail": e.detail})
+            else:
+                text = await transcription_batcher.transcribe(audio) if len(audio) else ""
+                await websocket.send_json(
+                    {
+                        "type": "transcript",
+                        "text": text,
+                        "duration_s": info["input_s"],
+                        "trimmed_s": info["output_s"],
+                        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                    }
+                )
+            buffer.clear()
+    except WebSocketDisconnect:
+        pass
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.core.security import verify_api_key
-from app.db import get_cursor
+from app.async_db import fetch_one, fetch_value, get_async_db
 from app.utils.encryption import encrypt_text
 
 router = APIRouter()
@@ -22,18 +22,20 @@ class UserCreate(BaseModel):
     active: bool = True
 
 
-def generate_voice_code(cur):
+async def generate_voice_code(conn):
     while True:
         code = "".join(secrets.choice("0123456789") for _ in range(4))
-        cur.execute("SELECT id FROM users WHERE voice_code = %s", (code,))
-        if not cur.fetchone():
+        if not await fetch_one(conn, "SELECT id FROM users WHERE voice_code = $1", code):
             return code
 
 
 @router.post("/users")
-def create_user(user: UserCreate, dependencies=[Depends(verify_api_key)]):
-    cur = get_cursor()
-    voice_code = generate_voice_code(cur)
+async def create_user(
+    user: UserCreate,
+    conn=Depends(get_async_db),
+    dependencies=[Depends(verify_api_key)],
+):
+    voice_code = await generate_voice_code(conn)
 
     try:
         # Encriptar los tres factores
@@ -41,25 +43,23 @@ def create_user(user: UserCreate, dependencies=[Depends(verify_api_key)]):
         f2 = encrypt_text(user.factor2)
         f3 = encrypt_text(user.factor3)
 
-        cur.execute(
+        user_id = await fetch_value(
+            conn,
             """
             INSERT INTO users (email, name, age, city, factor1, factor2, factor3, voice_code, active)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
             RETURNING id
             """,
-            (
-                user.email,
-                user.name,
-                user.age,
-                user.city,
-                f1,
-                f2,
-                f3,
-                voice_code,
-                user.active,
-            ),
+            user.email,
+            user.name,
+            user.age,
+            user.city,
+            f1,
+            f2,
+            f3,
+            voice_code,
+            user.active,
         )
-        user_id = cur.fetchone()[0]
 
         return {
             "id": user_id,
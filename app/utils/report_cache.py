@@ -0,0 +1,142 @@
+"""
+Caché en disco de informes generados (PDF + texto de Gemini).
+
+Estructura: REPORT_CACHE_DIR/<user_id>/<hash>.pdf y <hash>.txt, donde el hash
+se calcula a partir del id del usuario, sus datos, el contexto descifrado y la
+versión de la plantilla. Si cualquiera cambia, cambia la clave.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+REPORT_CACHE_DIR = os.getenv(
+    "REPORT_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache", "reports")
+)
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+REPORT_CACHE_MAX_AGE = int(os.getenv("REPORT_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+
+def report_cache_key(user_data: dict, context_data, template_version: str) -> str:
+    payload = json.dumps(
+        {"user": user_data, "context": context_data, "template": template_version},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ReportCache:
+    def __init__(
+        self,
+        directory=REPORT_CACHE_DIR,
+        max_bytes=REPORT_CACHE_MAX_BYTES,
+        max_age=REPORT_CACHE_MAX_AGE,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, user_id, key):
+        user_dir = os.path.join(self.directory, str(user_id))
+        return (
+            user_dir,
+            os.path.join(user_dir, f"{key}.pdf"),
+            os.path.join(user_dir, f"{key}.txt"),
+        )
+
+    def get(self, user_id, key):
+        """Devuelve (pdf_bytes, texto) o None si no está o expiró."""
+        _, pdf_path, txt_path = self._paths(user_id, key)
+        try:
+            if time.time() - os.path.getmtime(pdf_path) > self.max_age:
+                self._remove(pdf_path, txt_path)
+                self.misses += 1
+                return None
+            with open(pdf_path, "rb") as f:
+                pdf = f.read()
+            with open(txt_path, encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        # atime no es fiable (noatime), se usa mtime como marca de último uso
+        os.utime(pdf_path)
+        self.hits += 1
+        return pdf, text
+
+    def put(self, user_id, key, pdf: bytes, text: str):
+        user_dir, pdf_path, txt_path = self._paths(user_id, key)
+        os.makedirs(user_dir, exist_ok=True)
+
+        # Escritura atómica: otro proceso nunca ve un PDF a medio escribir
+        for path, data in ((txt_path, text.encode("utf-8")), (pdf_path, pdf)):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        self.evict()
+
+    def invalidate_user(self, user_id):
+        """Elimina todos los informes en caché de un usuario."""
+        shutil.rmtree(os.path.join(self.directory, str(user_id)), ignore_errors=True)
+
+    def evict(self):
+        """Elimina entradas expiradas y, si se supera `max_bytes`, las menos usadas."""
+        with self._lock:
+            entries = []
+            now = time.time()
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if not name.endswith(".pdf"):
+                        continue
+                    pdf_path = os.path.join(root, name)
+                    txt_path = pdf_path[: -len(".pdf")] + ".txt"
+                    try:
+                        mtime = os.path.getmtime(pdf_path)
+                        size = os.path.getsize(pdf_path)
+                        if os.path.exists(txt_path):
+                            size += os.path.getsize(txt_path)
+                    except OSError:
+                        continue
+                    if now - mtime > self.max_age:
+                        self._remove(pdf_path, txt_path)
+                    else:
+                        entries.append((mtime, size, pdf_path, txt_path))
+
+            total = sum(size for _, size, _, _ in entries)
+            for _, size, pdf_path, txt_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(pdf_path, txt_path)
+                total -= size
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+report_cache = ReportCache()
@@ -0,0 +1,176 @@
+import uuid
+
+from app.db import connection
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id UUID PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    filename TEXT,
+    pdf BYTEA,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+ALTER TABLE report_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ;
+CREATE INDEX IF NOT EXISTS report_jobs_pending_idx
+    ON report_jobs (created_at) WHERE status = 'pending';
+"""
+
+
+def ensure_schema():
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(SCHEMA)
+
+
+# --------- lado API (asyncpg) ---------
+
+
+async def enqueue_job(conn, user_id: int) -> str:
+    job_id = str(uuid.uuid4())
+    await conn.execute(
+        "INSERT INTO report_jobs (id, user_id, status) VALUES ($1, $2, $3)",
+        uuid.UUID(job_id),
+        user_id,
+        STATUS_PENDING,
+    )
+    return job_id
+
+
+async def get_job(conn, job_id: str, with_pdf: bool = False):
+    columns = "id, user_id, status, attempts, error, filename, created_at, started_at, finished_at"
+    if with_pdf:
+        columns += ", pdf"
+    row = await conn.fetchrow(
+        f"SELECT {columns} FROM report_jobs WHERE id = $1", uuid.UUID(job_id)
+    )
+    return dict(row) if row else None
+
+
+# --------- lado worker (psycopg2) ---------
+
+
+def claim_next_job():
+    """
+    Marca como 'running' el trabajo pendiente más antiguo y devuelve
+    (id, user_id, intento). El intento identifica esta ejecución en las
+    actualizaciones posteriores.
+    SKIP LOCKED permite que varios workers (hilos o procesos) reclamen en paralelo
+    sin tomar el mismo trabajo.
+    """
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE report_jobs
+                SET status = %s, started_at = now(), heartbeat_at = now(),
+                    attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM report_jobs
+                    WHERE status = %s
+                    ORDER BY created_at
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING id, user_id, attempts
+                """,
+                (STATUS_RUNNING, STATUS_PENDING),
+            )
+            return cur.fetchone()
+
+
+def heartbeat(job_id, attempt: int):
+    """El worker confirma que sigue generando el informe."""
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE report_jobs SET heartbeat_at = now()
+                WHERE id = %s AND status = %s AND attempts = %s
+                """,
+                (str(job_id), STATUS_RUNNING, attempt),
+            )
+
+
+def requeue_stale_jobs(timeout_seconds: int, max_attempts: int):
+    """
+    Devuelve a la cola los trabajos cuyo worker murió a mitad de ejecución:
+    los que llevan `timeout_seconds` sin latido. SKIP LOCKED evita pisar una
+    fila que otro worker está actualizando en ese momento.
+    """
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE report_jobs
+                SET status = CASE WHEN attempts >= %s THEN %s ELSE %s END,
+                    error = CASE WHEN attempts >= %s THEN 'Tiempo de ejecución agotado' END
+                WHERE id IN (
+                    SELECT id FROM report_jobs
+                    WHERE status = %s
+                      AND COALESCE(heartbeat_at, started_at) < now() - make_interval(secs => %s)
+                    FOR UPDATE SKIP LOCKED
+                )
+                """,
+                (
+                    max_attempts,
+                    STATUS_FAILED,
+                    STATUS_PENDING,
+                    max_attempts,
+                    STATUS_RUNNING,
+                    timeout_seconds,
+                ),
+            )
+            return cur.rowcount
+
+
+# complete_job y fail_job solo tocan la fila si sigue siendo de este intento: si
+# se re-encoló por falta de latido, el resultado es del reintento que la tomó.
+# Devuelven False cuando la ejecución ya no era la vigente.
+
+
+def complete_job(job_id, attempt: int, filename: str, pdf: bytes) -> bool:
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE report_jobs
+                SET status = %s, filename = %s, pdf = %s, error = NULL, finished_at = now()
+                WHERE id = %s AND status = %s AND attempts = %s
+                """,
+                (STATUS_DONE, filename, pdf, str(job_id), STATUS_RUNNING, attempt),
+            )
+            return cur.rowcount == 1
+
+
+def fail_job(job_id, attempt: int, error: str) -> bool:
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE report_jobs SET status = %s, error = %s, finished_at = now()
+                WHERE id = %s AND status = %s AND attempts = %s
+                """,
+                (STATUS_FAILED, error, str(job_id), STATUS_RUNNING, attempt),
+            )
+            return cur.rowcount == 1
+
+
+def load_user_row(user_id: int):
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, email, name, age, city, context, encrypted FROM users WHERE id = %s",
+                (user_id,),
+            )
+            return cur.fetchone()
@@ -0,0 +1,89 @@
+"""
+Deduplicación de llamadas concurrentes idénticas ("single flight").
+
+Si varias peticiones piden lo mismo mientras la primera sigue en curso, solo
+la primera ejecuta la función y el resto espera y recibe su resultado (o su
+excepción).
+
+Entre procesos se usa un lock de archivo por clave: el proceso que llega
+segundo espera al primero y, antes de ejecutar, llama a `recheck` para leer
+el resultado que el otro dejó en un almacén compartido (p. ej. la caché de
+informes). Sin `recheck` solo se serializan las ejecuciones.
+"""
+
+import hashlib
+import os
+import threading
+
+from filelock import FileLock
+
+SINGLE_FLIGHT_LOCK_DIR = os.getenv("SINGLE_FLIGHT_LOCK_DIR")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name: str, lock_dir: str = SINGLE_FLIGHT_LOCK_DIR):
+        self.name = name
+        self.lock_dir = lock_dir
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0, "rechecked": 0}
+
+    def do(self, key: str, fn, recheck=None):
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._execute(key, fn, recheck)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _execute(self, key, fn, recheck):
+        if not self.lock_dir:
+            return self._recheck_or_run(fn, recheck)
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        digest = hashlib.sha256(f"{self.name}:{key}".encode()).hexdigest()
+        with FileLock(os.path.join(self.lock_dir, f"{digest}.lock")):
+            return self._recheck_or_run(fn, recheck)
+
+    def _recheck_or_run(self, fn, recheck):
+        # Otra llamada pudo terminar justo antes de que esta tomara el liderazgo
+        if recheck is not None:
+            result = recheck()
+            if result is not None:
+                with self._lock:
+                    self._stats["rechecked"] += 1
+                return result
+        with self._lock:
+            self._stats["executed"] += 1
+        return fn()
+
+    def stats(self):
+        with self._lock:
+            return {"name": self.name, "in_flight": len(self._calls), **self._stats}
@@ -0,0 +1,144 @@
+"""
+Micro-batching de transcripciones Whisper para la API.
+
+Las peticiones concurrentes se encolan; un hilo toma hasta WHISPER_MAX_BATCH
+audios (esperando como mucho WHISPER_MAX_WAIT_MS desde el primero), los
+rellena a 30 s con `pad_or_trim`, apila sus espectrogramas y los decodifica
+en una sola pasada con `whisper.decode`. Cada audio debe durar ≤ 30 s.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from chatbot.core.whisper_models import get_whisper_model, whisper_models
+
+WHISPER_MAX_BATCH = int(os.getenv("WHISPER_MAX_BATCH", "8"))
+WHISPER_MAX_WAIT_MS = float(os.getenv("WHISPER_MAX_WAIT_MS", "30"))
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "es")
+
+
+class TranscriptionBatcher:
+    def __init__(
+        self,
+        max_batch=WHISPER_MAX_BATCH,
+        max_wait_ms=WHISPER_MAX_WAIT_MS,
+        model_size=None,
+        language=WHISPER_LANGUAGE,
+    ):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.model_size = model_size
+        self.language = language
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=1000)
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="whisper-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, audio) -> Future:
+        """Encola un audio float32 mono a 16 kHz; el Future devuelve el texto."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(audio, dtype=np.float32), future, time.perf_counter()))
+        return future
+
+    async def transcribe(self, audio) -> str:
+        return await asyncio.wrap_future(self.submit(audio))
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Las peticiones canceladas (cliente desconectado) no se decodifican
+            batch = [
+                item for item in self._next_batch() if item[1].set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            try:
+                texts = self._decode([audio for audio, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                for _, _, queued_at in batch:
+                    self._latencies_ms.append((now - queued_at) * 1000)
+            for (_, future, _), text in zip(batch, texts):
+                future.set_result(text)
+
+    def _decode(self, audios):
+        import torch
+        import whisper
+
+        model = get_whisper_model(self.model_size)
+        mels = torch.stack(
+            [
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(audio), model.dims.n_mels, device=model.device
+                )
+                for audio in audios
+            ]
+        )
+        options = whisper.DecodingOptions(
+            language=self.language,
+            without_timestamps=True,
+            fp16=model.device.type != "cpu",
+        )
+        # Mismo modelo que el motor whisper y los códigos de voz: un decode a la vez
+        with whisper_models.decode_lock(self.model_size):
+            results = whisper.decode(model, mels, options)
+        return [result.text.strip() for result in results]
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            batches, items = self.batches, self.items
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1)
+
+        return {
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "queued": self._queue.qsize(),
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+        }
+
+
+transcription_batcher = TranscriptionBatcher()
@@ -1,21 +1,18 @@
-import numpy as np
-import sounddevice as sd
-import whisper
+from chatbot.core.audio_capture import record
+from chatbot.core.voice_code import recognize_code
+from chatbot.core.whisper_engine import preprocess_audio
 
-model = whisper.load_model("base")  # O tiny/small/medium/large
 
-
-def record_and_transcribe(duration=3, fs=16000):
-    """Graba audio y devuelve la transcripción como texto."""
+def record_and_transcribe(duration=3, fs=16000, source=None):
+    """Graba audio (hasta un silencio o `duration` segundos) y devuelve el código transcrito."""
     print("Por favor, diga su código de voz de 4 dígitos...")
-    recording = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype="float32")
-    sd.wait()
-    audio = np.squeeze(recording)
-    result = model.transcribe(audio, fp16=False)
-    code_spoken = "".join(filter(str.isdigit, result["text"]))
-    if len(code_spoken) != 4:
-        print(f"Código detectado inválido: {code_spoken}")
+    audio, info = preprocess_audio(record(duration, fs, source), fs)
+    print(f"Audio: {info['input_s']} s -> {info['output_s']} s tras el preprocesado")
+    # Decodificación restringida a dígitos; si no da 4, transcripción completa
+    code_spoken, path = recognize_code(audio)
+    if code_spoken is None:
+        print("Código detectado inválido")
         return None
 
-    print(f"Transcripción detectada: {code_spoken}")
+    print(f"Transcripción detectada ({path}): {code_spoken}")
     return code_spoken
@@ -0,0 +1,174 @@
+"""
+Workers que generan los informes PDF encolados en `report_jobs`.
+
+Se pueden ejecutar dentro del proceso de la API (REPORT_WORKER_MODE=inprocess)
+o como procesos independientes:
+
+    uv run python -m app.workers.report_worker --concurrency 2
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.utils import report_jobs
+from app.utils.report_generator import (
+    build_report_inputs,
+    render_report,
+    report_filename,
+)
+
+REPORT_WORKER_MODE = os.getenv("REPORT_WORKER_MODE", "inprocess")
+REPORT_WORKER_CONCURRENCY = int(os.getenv("REPORT_WORKER_CONCURRENCY", "2"))
+# Segundos sin latido tras los que un trabajo 'running' se da por abandonado
+REPORT_JOB_TIMEOUT = int(os.getenv("REPORT_JOB_TIMEOUT", "120"))
+REPORT_JOB_HEARTBEAT = float(os.getenv("REPORT_JOB_HEARTBEAT", "30"))
+REPORT_JOB_MAX_ATTEMPTS = int(os.getenv("REPORT_JOB_MAX_ATTEMPTS", "3"))
+POLL_INTERVAL = float(os.getenv("REPORT_WORKER_POLL_INTERVAL", "2"))
+
+
+def _heartbeat(job_id, attempt, done):
+    # Mientras el trabajo sigue vivo no se vuelve a encolar
+    while not done.wait(REPORT_JOB_HEARTBEAT):
+        try:
+            report_jobs.heartbeat(job_id, attempt)
+        except Exception as e:
+            print(f"⚠️ No se pudo registrar el latido del trabajo {job_id}: {e}")
+
+
+def _superseded(job_id, attempt):
+    print(
+        f"⚠️ El trabajo {job_id} se re-encoló durante el intento {attempt}: "
+        "se descarta su resultado"
+    )
+
+
+def _fail_job(job_id, attempt, error):
+    try:
+        if not report_jobs.fail_job(job_id, attempt, error):
+            _superseded(job_id, attempt)
+    except Exception as e:
+        # Si la base no responde, requeue_stale_jobs lo recogerá al expirar el latido
+        print(f"❌ No se pudo marcar como fallido el trabajo {job_id}: {e}")
+
+
+def process_job(job_id, user_id, attempt):
+    done = threading.Event()
+    threading.Thread(
+        target=_heartbeat,
+        args=(job_id, attempt, done),
+        name=f"report-heartbeat-{job_id}",
+        daemon=True,
+    ).start()
+    try:
+        user_data, context_data = build_report_inputs(
+            report_jobs.load_user_row(user_id)
+        )
+        pdf, _ = render_report(user_data, context_data)
+        if not report_jobs.complete_job(job_id, attempt, report_filename(user_data), pdf):
+            _superseded(job_id, attempt)
+    except HTTPException as e:
+        _fail_job(job_id, attempt, e.detail)
+    except Exception as e:
+        print(f"❌ Error generando informe del trabajo {job_id}: {e}")
+        _fail_job(job_id, attempt, str(e))
+    finally:
+        done.set()
+
+
+class ReportWorkerPool:
+    """
+    N hilos que reclaman trabajos de la tabla. La concurrencia queda acotada
+    por `concurrency`, independiente del threadpool que atiende las peticiones.
+    """
+
+    def __init__(self, concurrency=REPORT_WORKER_CONCURRENCY, poll_interval=POLL_INTERVAL):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        report_jobs.ensure_schema()
+        for i in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._run, name=f"report-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self):
+        """Despierta a los workers cuando se encola un trabajo en este proceso."""
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                report_jobs.requeue_stale_jobs(
+                    REPORT_JOB_TIMEOUT, REPORT_JOB_MAX_ATTEMPTS
+                )
+                job = report_jobs.claim_next_job()
+            except Exception as e:
+                print(f"❌ Error consultando la cola de informes: {e}")
+                job = None
+
+            if job:
+                try:
+                    process_job(*job)
+                except Exception as e:
+                    # Un fallo inesperado no debe matar el hilo: sigue consultando la cola
+                    print(f"❌ Error inesperado en el worker de informes: {e}")
+                continue
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+
+worker_pool = None
+
+
+def start_inprocess_workers():
+    global worker_pool
+    if REPORT_WORKER_MODE == "inprocess" and worker_pool is None:
+        worker_pool = ReportWorkerPool()
+        worker_pool.start()
+    return worker_pool
+
+
+def stop_inprocess_workers():
+    global worker_pool
+    if worker_pool is not None:
+        worker_pool.stop(timeout=5)
+        worker_pool = None
+
+
+def notify_workers():
+    if worker_pool is not None:
+        worker_pool.notify()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=REPORT_WORKER_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+
+    pool = ReportWorkerPool(args.concurrency, args.poll_interval)
+    pool.start()
+    print(f"Workers de informes en ejecución: {args.concurrency}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
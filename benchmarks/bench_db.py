@@ -0,0 +1,86 @@
+"""
+Compara peticiones/segundo del acceso a datos síncrono (pool psycopg2 en un
+threadpool, como los handlers `def`) contra el asíncrono (pool asyncpg en el
+event loop, como los handlers `async def`).
+
+Requiere un Postgres local accesible en DATABASE_URL.
+
+    uv run python -m benchmarks.bench_db --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.async_db import close_pool, fetch_one, open_pool
+from app.db import connection, db_pool
+
+# Tamaño por defecto del threadpool de Starlette (anyio)
+STARLETTE_THREADS = 40
+
+QUERY_SYNC = "SELECT structured_context, encrypted FROM user_contexts WHERE user_id = %s"
+QUERY_ASYNC = "SELECT structured_context, encrypted FROM user_contexts WHERE user_id = $1"
+
+
+def sync_request(user_id, latency):
+    with connection() as conn:
+        with conn.cursor() as cur:
+            if latency:
+                cur.execute("SELECT pg_sleep(%s)", (latency,))
+            cur.execute(QUERY_SYNC, (user_id,))
+            return cur.fetchone()
+
+
+def bench_sync(total, user_id, latency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=STARLETTE_THREADS) as executor:
+        list(executor.map(lambda _: sync_request(user_id, latency), range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def bench_async(total, concurrency, user_id, latency):
+    pool = await open_pool()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            async with pool.acquire() as conn:
+                if latency:
+                    await conn.execute("SELECT pg_sleep($1)", latency)
+                return await fetch_one(conn, QUERY_ASYNC, user_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    await close_pool()
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Segundos de pg_sleep por petición para simular consultas lentas",
+    )
+    args = parser.parse_args()
+
+    sync_rps = bench_sync(args.requests, args.user_id, args.latency)
+    db_pool.close()
+    async_rps = asyncio.run(
+        bench_async(args.requests, args.concurrency, args.user_id, args.latency)
+    )
+
+    print(f"Peticiones: {args.requests}  concurrencia async: {args.concurrency}")
+    print(f"sync  (psycopg2 + {STARLETTE_THREADS} hilos): {sync_rps:8.1f} req/s")
+    print(f"async (asyncpg):                 {async_rps:8.1f} req/s")
+    print(f"Mejora: x{async_rps / sync_rps:.2f}")
+
+
+if __name__ == "__main__":
+    main()
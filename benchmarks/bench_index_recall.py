@@ -0,0 +1,106 @@
+"""
+Recall@k y memoria de los modos del índice NumPy (float16, int8, int8 + re-rank)
+frente al índice float32 exacto.
+
+    uv run python -m benchmarks.bench_index_recall                     # desde chroma_db
+    uv run python -m benchmarks.bench_index_recall --queries preguntas.txt
+    uv run python -m benchmarks.bench_index_recall --synthetic 20000   # sin Chroma
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from chatbot.chromadb_utils.numpy_index import (CHROMA_DB_PATH, NumpyIndex,
+                                                _normalize, write_index)
+
+MODES = [
+    ("float32", "float32", False),
+    ("float16", "float16", False),
+    ("int8", "int8", False),
+    ("int8+rerank", "int8", True),
+]
+
+
+def load_chroma_matrix(db_path):
+    from langchain_chroma import Chroma
+
+    collection = Chroma(persist_directory=db_path)._collection
+    data = collection.get(include=["embeddings"])
+    return _normalize(np.asarray(data["embeddings"], dtype=np.float32))
+
+
+def synthetic_matrix(rows, dim, seed):
+    # Vectores agrupados en temas, más parecidos a un corpus real que el ruido puro
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(rows // 50, 1), dim))
+    labels = rng.integers(0, len(centers), size=rows)
+    return _normalize(
+        (centers[labels] + 0.6 * rng.normal(size=(rows, dim))).astype(np.float32)
+    )
+
+
+def build_queries(matrix, args, rng):
+    if args.queries:
+        from chatbot.chromadb_utils.embedding_cache import get_embeddings
+
+        with open(args.queries, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+        embeddings = get_embeddings("all-MiniLM-L6-v2")
+        return _normalize(np.asarray(embeddings.embed_documents(questions), dtype=np.float32))
+
+    # Consultas sintéticas: chunks existentes con ruido
+    rows = rng.choice(len(matrix), size=min(args.n_queries, len(matrix)), replace=False)
+    noisy = matrix[rows] + args.noise * rng.normal(size=(len(rows), matrix.shape[1]))
+    return _normalize(noisy.astype(np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-path", default=CHROMA_DB_PATH)
+    parser.add_argument("--synthetic", type=int, default=0, help="Filas sintéticas")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", help="Archivo con una pregunta por línea")
+    parser.add_argument("--n-queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.synthetic:
+        matrix = synthetic_matrix(args.synthetic, args.dim, args.seed)
+    else:
+        matrix = load_chroma_matrix(args.db_path)
+    queries = build_queries(matrix, args, rng)
+    rows = [(str(i), "", {}) for i in range(len(matrix))]
+
+    exact = [set(np.argsort(-(matrix @ q))[: args.k]) for q in queries]
+
+    print(f"{len(matrix)} vectores de {matrix.shape[1]} dim, {len(queries)} consultas, k={args.k}")
+    print(f"{'modo':<13} {'recall@k':>9} {'MB':>8} {'x menos':>8} {'ms/consulta':>12}")
+    baseline_bytes = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, dtype, rerank in MODES:
+            path = os.path.join(tmp, name)
+            write_index(path, matrix, rows, dtype, "bench", rerank)
+            index = NumpyIndex(path)
+
+            started = time.perf_counter()
+            results = [set(index.search(q, args.k)[0].tolist()) for q in queries]
+            elapsed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+            recall = np.mean([len(r & e) / args.k for r, e in zip(results, exact)])
+            nbytes = index.nbytes()
+            baseline_bytes = baseline_bytes or nbytes
+            print(
+                f"{name:<13} {recall:>9.3f} {nbytes / 1e6:>8.2f} "
+                f"{baseline_bytes / nbytes:>8.1f} {elapsed_ms:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Throughput y latencia p95 de la transcripción con micro-batching, bajo carga
+concurrente de audio sintético, para varios tamaños máximos de lote.
+
+    uv run python -m benchmarks.bench_transcribe
+    uv run python -m benchmarks.bench_transcribe --model tiny --clients 16 --max-batch 1,4,8
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.utils.transcription_batcher import TranscriptionBatcher
+from chatbot.core.audio_capture import SAMPLE_RATE
+from chatbot.core.whisper_models import get_whisper_model
+
+
+def synthetic_audio(seconds, rng):
+    # Tonos con envolvente silábica sobre ruido: Whisper lo procesa como voz
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = rng.uniform(120, 260)
+    envelope = np.clip(np.sin(2 * np.pi * rng.uniform(2, 5) * t), 0, None)
+    voice = 0.3 * envelope * np.sin(2 * np.pi * pitch * t)
+    return (voice + 0.01 * rng.normal(size=len(t))).astype(np.float32)
+
+
+def run(batcher, audios, clients):
+    latencies = []
+
+    def one(audio):
+        started = time.perf_counter()
+        batcher.submit(audio).result()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, audios))
+    return time.perf_counter() - started, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None, help="Tamaño de Whisper (WHISPER_MODEL)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duración de cada audio")
+    parser.add_argument("--max-batch", default="1,4,8")
+    parser.add_argument("--max-wait-ms", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    audios = [synthetic_audio(args.seconds, rng) for _ in range(args.requests)]
+    get_whisper_model(args.model)
+
+    print(
+        f"{args.requests} peticiones de {args.seconds:.1f}s, {args.clients} clientes concurrentes"
+    )
+    print(f"{'lote máx':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'lote medio':>11}")
+    for max_batch in (int(size) for size in args.max_batch.split(",")):
+        batcher = TranscriptionBatcher(max_batch, args.max_wait_ms, model_size=args.model)
+        # Calentamiento: la primera pasada incluye inicializaciones de torch
+        batcher.submit(audios[0]).result()
+        batcher.batches = batcher.items = 0
+
+        elapsed, latencies = run(batcher, audios, args.clients)
+        stats = batcher.stats()
+        print(
+            f"{max_batch:>8} {len(audios) / elapsed:>7.2f} {np.percentile(latencies, 50):>8.0f} "
+            f"{np.percentile(latencies, 95):>8.0f} {stats['avg_batch_size']:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
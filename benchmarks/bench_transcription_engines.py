@@ -0,0 +1,124 @@
+"""
+Factor de tiempo real (RTF = tiempo de proceso / duración del audio) y WER de
+cada motor de transcripción sobre fixtures en español.
+
+Fixtures: pares `nombre.wav` + `nombre.txt` (texto de referencia) en
+`benchmarks/fixtures/transcription/`. Con --generate se sintetizan frases con
+el motor TTS local (útil para comparar motores, no como medida absoluta de WER).
+
+    uv run python -m benchmarks.bench_transcription_engines --generate
+    uv run python -m benchmarks.bench_transcription_engines --engines whisper,faster-whisper --threads 4
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import numpy as np
+
+from chatbot.core.audio_capture import SAMPLE_RATE, read_wav
+from chatbot.core.text_utils import fold_accents
+from chatbot.core.transcription_engines import ENGINES
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "transcription")
+SENTENCES = [
+    "Hoy me siento un poco cansado y con pocas ganas de salir de casa.",
+    "Últimamente duermo mal y me despierto varias veces durante la noche.",
+    "Me gustaría aprender técnicas de respiración para controlar la ansiedad.",
+    "El trabajo me genera mucho estrés y no sé cómo desconectar.",
+    "Ayer hablé con mi familia y me sentí mucho mejor.",
+    "Quiero saber qué puedo hacer cuando tengo pensamientos negativos.",
+]
+
+
+_word_re = re.compile(r"[a-z0-9ñ]+")
+
+
+def words(text):
+    return _word_re.findall(fold_accents(text))
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = words(reference), words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+    # Distancia de edición por palabras, fila a fila
+    previous = np.arange(len(hyp) + 1)
+    for i, ref_word in enumerate(ref, start=1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def generate_fixtures(directory):
+    from chatbot.core.tts_backends import create_backends
+
+    backends = create_backends(["espeak", "pyttsx3"])
+    if not backends:
+        raise SystemExit("Se necesita espeak-ng o pyttsx3 para generar fixtures")
+    os.makedirs(directory, exist_ok=True)
+    for i, sentence in enumerate(SENTENCES):
+        name = os.path.join(directory, f"frase_{i:02d}")
+        with open(f"{name}.wav", "wb") as f:
+            f.write(backends[0].synthesize(sentence, "es"))
+        with open(f"{name}.txt", "w", encoding="utf-8") as f:
+            f.write(sentence)
+    print(f"{len(SENTENCES)} fixtures generados en {directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", default="whisper,faster-whisper")
+    parser.add_argument("--model", default=None, help="Tamaño del modelo (WHISPER_MODEL)")
+    parser.add_argument("--threads", type=int, default=0, help="Hilos de CPU (0 = por defecto)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--generate", action="store_true")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_fixtures(args.fixtures)
+
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.wav"))):
+        with open(path[: -len(".wav")] + ".txt", encoding="utf-8") as f:
+            fixtures.append((read_wav(path), f.read().strip()))
+    if not fixtures:
+        raise SystemExit(f"No hay fixtures en {args.fixtures} (usa --generate)")
+
+    total_seconds = sum(len(audio) for audio, _ in fixtures) / SAMPLE_RATE
+    print(f"{len(fixtures)} audios, {total_seconds:.1f}s en total")
+    print(f"{'motor':<15} {'RTF':>6} {'WER':>6} {'carga s':>8}")
+    for name in (engine.strip() for engine in args.engines.split(",")):
+        started = time.perf_counter()
+        try:
+            engine = ENGINES[name](args.model, threads=args.threads)
+            # Fuerza la carga del modelo antes de medir
+            engine.transcribe(fixtures[0][0])
+        except ImportError as e:
+            print(f"{name:<15} no disponible: {e}")
+            continue
+        load_seconds = time.perf_counter() - started
+
+        errors, elapsed = [], 0.0
+        for audio, reference in fixtures:
+            started = time.perf_counter()
+            hypothesis = engine.transcribe(audio)
+            elapsed += time.perf_counter() - started
+            errors.append(word_error_rate(reference, hypothesis))
+        print(
+            f"{name:<15} {elapsed / total_seconds:>6.3f} {np.mean(errors):>6.3f} "
+            f"{load_seconds:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Tiempo de síntesis por motor TTS (sin caché): ms por frase y ms por carácter.
+
+    uv run python -m benchmarks.bench_tts
+    uv run python -m benchmarks.bench_tts --backends gtts,espeak --repeat 5
+    uv run python -m benchmarks.bench_tts --texts frases.txt
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from chatbot.core.tts_backends import create_backends
+from chatbot.core.tts_cache import FIXED_PHRASES
+
+LONG_TEXTS = [
+    "La ansiedad es una respuesta natural del cuerpo ante situaciones que percibimos como amenazantes.",
+    "Cuando notes que la respiración se acelera, intenta inhalar durante cuatro segundos, "
+    "mantener el aire otros cuatro y exhalar lentamente durante seis.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default="gtts,espeak,pyttsx3")
+    parser.add_argument("--texts", help="Archivo con una frase por línea")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lang", default="es")
+    args = parser.parse_args()
+
+    if args.texts:
+        with open(args.texts, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = list(FIXED_PHRASES) + LONG_TEXTS
+
+    backends = create_backends([name.strip() for name in args.backends.split(",")])
+    chars = sum(len(text) for text in texts)
+    print(f"{len(texts)} frases, {chars} caracteres, {args.repeat} repeticiones")
+    print(
+        f"{'motor':<9} {'ms/frase':>9} {'p95 ms':>8} {'ms/char':>8} {'KB/frase':>9} {'fallos':>7}"
+    )
+
+    for backend in backends:
+        timings, per_char, sizes, failures = [], [], [], 0
+        for _ in range(args.repeat):
+            for text in texts:
+                started = time.perf_counter()
+                try:
+                    audio = backend.synthesize(text, args.lang)
+                except Exception as e:
+                    failures += 1
+                    print(f"   [{backend.name}] {e}")
+                    continue
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timings.append(elapsed_ms)
+                per_char.append(elapsed_ms / len(text))
+                sizes.append(len(audio) / 1024)
+
+        if not timings:
+            print(f"{backend.name:<9} {'-':>9} {'-':>8} {'-':>8} {'-':>9} {failures:>7}")
+            continue
+        print(
+            f"{backend.name:<9} {np.mean(timings):>9.1f} {np.percentile(timings, 95):>8.1f} "
+            f"{np.mean(per_char):>8.2f} {np.mean(sizes):>9.1f} {failures:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Precisión y latencia del reconocimiento de códigos de voz: ruta rápida
+(dígitos, modelo pequeño) frente a la transcripción completa.
+
+Fixtures: WAV cuyo nombre empieza por el código esperado, p. ej.
+`benchmarks/fixtures/voice_codes/4821_ana.wav`. Se pueden generar con el
+motor TTS local (no sustituye a grabaciones reales, pero sirve de referencia):
+
+    uv run python -m benchmarks.bench_voice_code --generate 20
+    uv run python -m benchmarks.bench_voice_code
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+
+from chatbot.core.audio_capture import read_wav
+from chatbot.core.voice_code import (DIGIT_WORDS, decode_code_fast,
+                                     decode_code_full, parse_digits)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "voice_codes")
+WORDS = {digit: word for word, digit in DIGIT_WORDS.items() if word not in ("un", "una")}
+
+
+def generate_fixtures(n, directory, seed):
+    from chatbot.core.tts_backends import create_backends
+
+    backends = create_backends(["espeak", "pyttsx3"])
+    if not backends:
+        raise SystemExit("Se necesita espeak-ng o pyttsx3 para generar fixtures")
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    for i in range(n):
+        code = "".join(str(d) for d in rng.integers(0, 10, size=4))
+        text = ", ".join(WORDS[d] for d in code)
+        audio = backends[0].synthesize(text, "es")
+        with open(os.path.join(directory, f"{code}_{backends[0].name}_{i}.wav"), "wb") as f:
+            f.write(audio)
+    print(f"{n} fixtures generados en {directory}")
+
+
+def evaluate(name, decode, fixtures):
+    latencies, correct = [], 0
+    for expected, audio in fixtures:
+        started = time.perf_counter()
+        code = parse_digits(decode(audio))
+        latencies.append((time.perf_counter() - started) * 1000)
+        correct += code == expected
+    print(
+        f"{name:<6} {correct / len(fixtures):>9.3f} {np.mean(latencies):>9.0f} "
+        f"{np.percentile(latencies, 95):>8.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--generate", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_fixtures(args.generate, args.fixtures, args.seed)
+
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.wav"))):
+        expected = os.path.basename(path).split("_")[0]
+        fixtures.append((expected, read_wav(path)))
+    if not fixtures:
+        raise SystemExit(f"No hay fixtures en {args.fixtures} (usa --generate N)")
+
+    # La primera llamada de cada ruta carga el modelo: no entra en la medida
+    decode_code_fast(fixtures[0][1])
+    decode_code_full(fixtures[0][1])
+
+    print(f"{len(fixtures)} códigos")
+    print(f"{'ruta':<6} {'precisión':>9} {'media ms':>9} {'p95 ms':>8}")
+    evaluate("fast", decode_code_fast, fixtures)
+    evaluate("full", decode_code_full, fixtures)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
-from chatbot.core.chat_chain import handle_chat_flow
+from chatbot.core.chat_chain import stream_chat_flow
 from chatbot.core.redis_client import delete_session
+from chatbot.core.speech_pipeline import speak_stream
 from chatbot.core.tts_engine import speak
 from chatbot.db.user_repository import UserRepository
 
 
+def _echo(tokens):
+    for token in tokens:
+        print(token, end="", flush=True)
+        yield token
+
+
 def chat_loop(user_id, name):
     
     # 1. extraer información del usuario de la base de datos
@@ -32,18 +39,31 @@ def chat_loop(user_id, name):
             # --------- uso de gemini con intervención y contexto ---------
             # response = model.generate_content(user_input, user_context)
             # ai_text = response.text.strip()
-            ai_text, user_new_context = handle_chat_flow(user_input, user_context)
-            
-            # 4. almacenar la información en la base de datos ( como no sabemos cuando el usuario va a terminar la conversación, almacenamos cada que se procese)
-            UserRepository().update(user_id, context=user_new_context)
-            user_context = user_new_context
+            # la extracción de contexto sigue en segundo plano mientras se habla,
+            # y la respuesta se habla por frases según la genera Gemini
+            tokens, context_future = stream_chat_flow(user_input, user_context)
             
             # --------- uso de gemini sin intervención ni contexto ---------
             # response = model.generate_content(user_input)
             # ai_text = response.text.strip()
             
-            speak(ai_text)
-            print(f"IA: {ai_text}")
+            print("IA: ", end="", flush=True)
+            speak_stream(_echo(tokens))
+            print()
+        except KeyboardInterrupt:
+            # Ctrl+C corta la respuesta hablada (barge-in) sin salir del chat
+            print("\n(respuesta interrumpida)")
+            continue
         except Exception as e:
             print(f"Error con Gemini: {e}")
             speak("Lo siento, tuve un problema para responder.")
+            continue
+
+        try:
+            # 4. almacenar la información en la base de datos ( como no sabemos cuando el usuario va a terminar la conversación, almacenamos cada que se procese)
+            user_new_context = context_future.result()
+            UserRepository().update(user_id, context=user_new_context)
+            user_context = user_new_context
+        except Exception as e:
+            # sin contexto nuevo se sigue con el anterior
+            print(f"⚠️ No se pudo actualizar el contexto: {e}")
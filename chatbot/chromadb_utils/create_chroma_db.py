@@ -1,12 +1,28 @@
+"""
+Crea o actualiza la base vectorial a partir de los documentos de `data/`.
+
+    uv run python -m chatbot.chromadb_utils.create_chroma_db          # incremental
+    uv run python -m chatbot.chromadb_utils.create_chroma_db --full   # regenera todo
+    uv run python -m chatbot.chromadb_utils.create_chroma_db --workers 4 --batch-size 128
+"""
+
+import argparse
+import json
 import os
 import shutil
+import time
 
 from langchain_chroma import Chroma
-from langchain_community.document_loaders import (DirectoryLoader,
-                                                  PyPDFDirectoryLoader,
-                                                  UnstructuredMarkdownLoader)
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from chatbot.chromadb_utils.embedding_cache import get_embeddings
+from chatbot.chromadb_utils.ingest_manifest import (IngestManifest, find_files,
+                                                    record_file, remove_file)
+from chatbot.chromadb_utils.ingest_pipeline import plan_tasks, run_pipeline
+from chatbot.chromadb_utils.numpy_index import (NUMPY_INDEX_PATH,
+                                                export_from_chroma)
+from chatbot.chromadb_utils.retrieval_cache import bump_index_version
+from chatbot.chromadb_utils.sparse_index import (SPARSE_INDEX_PATH,
+                                                 build_from_chroma)
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -14,54 +30,142 @@ project_root = os.path.abspath(os.path.join(current_dir, "../../"))
 data_path = os.path.join(project_root, "data")
 db_path = os.path.join(project_root, "chroma_db")
 
-print(f"Ruta de datos: {data_path}")
-print(f"Ruta de base de datos: {db_path}")
-
-documents = []
-
-# Verificar si la carpeta data existe
-if not os.path.exists(data_path):
-    print(f"Error: La carpeta de datos no existe en: {data_path}")
-    exit()
-
-# Cargar archivos Markdown
-loader_md = DirectoryLoader(
-    data_path,
-    glob='**/*.md',
-    loader_cls=UnstructuredMarkdownLoader,
-    show_progress=True
-)
-docs_md = loader_md.load()
-documents.extend(docs_md)
-print(f"   -> Encontrados {len(docs_md)} archivos Markdown.")
-
-# Cargar PDFs (Opcional, si agregas en el futuro)
-loader_pdf = PyPDFDirectoryLoader(data_path)
-docs_pdf = loader_pdf.load()
-documents.extend(docs_pdf)
-print(f"   -> Encontrados {len(docs_pdf)} archivos PDF.")
-
-if len(documents) == 0:
-    print("Error: No se encontraron documentos. Revisa la carpeta 'data'.")
-    exit()
-
-print(f"Total documentos cargados: {len(documents)}")
-
-text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-splits = text_splitter.split_documents(documents)
-
-embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-
-# Opcional: Borrar la DB anterior para asegurar una creación limpia
-if os.path.exists(db_path):
-    shutil.rmtree(db_path)
-    print("Base de datos anterior eliminada para una regeneración limpia.")
-
-print("Generando embeddings y guardando en ChromaDB...")
-vectorstore = Chroma.from_documents(
-    documents=splits, 
-    embedding=embeddings, 
-    persist_directory=db_path
-)
-
-print("Base de datos creada con éxito en la ruta absoluta.")
\ No newline at end of file
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+EXTENSIONS = (".md", ".pdf")
+
+
+def ingest(full=False, workers=None, batch_size=64, upsert_batch_size=512):
+    print(f"Ruta de datos: {data_path}")
+    print(f"Ruta de base de datos: {db_path}")
+
+    # Verificar si la carpeta data existe
+    if not os.path.exists(data_path):
+        print(f"Error: La carpeta de datos no existe en: {data_path}")
+        return
+
+    files = find_files(data_path, EXTENSIONS)
+    if not files:
+        print("Error: No se encontraron documentos. Revisa la carpeta 'data'.")
+        return
+
+    settings = {
+        "embedding_model": EMBEDDING_MODEL,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+    }
+    manifest = IngestManifest.load(db_path, settings)
+
+    # Una base sin manifiesto (creada por versiones anteriores) no se puede
+    # actualizar por diferencias: se regenera completa
+    untracked = os.path.exists(db_path) and not os.path.exists(manifest.path)
+    if full or manifest.outdated or untracked:
+        if os.path.exists(db_path):
+            shutil.rmtree(db_path)
+            print("Base de datos anterior eliminada para una regeneración limpia.")
+        manifest = IngestManifest(db_path, settings)
+
+    started = time.perf_counter()
+    changed, removed = manifest.plan(files)
+    print(
+        f"   -> {len(files)} archivos: {len(changed)} nuevos o modificados, "
+        f"{len(removed)} eliminados, {len(files) - len(changed)} sin cambios."
+    )
+
+    if not changed and not removed:
+        print(f"La base de datos ya está al día ({time.perf_counter() - started:.1f}s).")
+        return
+
+    embeddings = get_embeddings(EMBEDDING_MODEL)
+    vectorstore = Chroma(persist_directory=db_path, embedding_function=embeddings)
+
+    deleted = 0
+    for rel_path in removed:
+        deleted += remove_file(vectorstore, manifest, rel_path)
+        print(f"   -> Eliminado: {rel_path}")
+
+    # Los chunks que ya existen en Chroma (archivos editados) no se vuelven a embeber
+    existing_ids = {
+        chunk_id
+        for rel_path in changed
+        for chunk_id in manifest.files.get(rel_path, {}).get("chunks", [])
+    }
+    file_ids, stats = run_pipeline(
+        plan_tasks({rel_path: files[rel_path] for rel_path in changed}),
+        embeddings,
+        vectorstore._collection,
+        skip_ids=existing_ids,
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        workers=workers,
+        batch_size=batch_size,
+        upsert_batch_size=upsert_batch_size,
+    )
+
+    for rel_path, sha in changed.items():
+        deleted += record_file(
+            vectorstore, manifest, rel_path, sha, file_ids.get(rel_path, [])
+        )
+
+    print(f"Ingestión: {stats.report()}")
+    print(f"Caché de embeddings: {embeddings.stats()}")
+    print(
+        f"Base de datos actualizada: {stats.embedded} chunks embebidos, {deleted} eliminados "
+        f"en {time.perf_counter() - started:.1f}s."
+    )
+
+    refresh_numpy_index()
+    refresh_sparse_index()
+    # Las cachés de consultas del chat se vacían al ver el nuevo marcador
+    bump_index_version()
+
+
+def refresh_numpy_index():
+    """Si ya existe un índice NumPy exportado, se regenera para que no quede desfasado."""
+    meta_path = os.path.join(NUMPY_INDEX_PATH, "meta.json")
+    if not os.path.exists(meta_path):
+        return
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    rows, _ = export_from_chroma(
+        db_path,
+        NUMPY_INDEX_PATH,
+        meta.get("dtype", "float32"),
+        EMBEDDING_MODEL,
+        rerank=meta.get("rerank", False),
+    )
+    print(f"Índice NumPy actualizado: {rows} vectores.")
+
+
+def refresh_sparse_index():
+    """Igual que el índice NumPy: el BM25 se reconstruye solo si ya se usa."""
+    if not os.path.exists(os.path.join(SPARSE_INDEX_PATH, "postings.npz")):
+        return
+    n_docs, n_terms = build_from_chroma(db_path, SPARSE_INDEX_PATH)
+    print(f"Índice BM25 actualizado: {n_docs} documentos, {n_terms} términos.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Borra la base y vuelve a embeber todos los documentos",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Procesos de parseo (por defecto, núcleos)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=64, help="Chunks por lote de embeddings"
+    )
+    parser.add_argument(
+        "--upsert-batch-size", type=int, default=512, help="Chunks por upsert a Chroma"
+    )
+    args = parser.parse_args()
+    ingest(
+        full=args.full,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        upsert_batch_size=args.upsert_batch_size,
+    )
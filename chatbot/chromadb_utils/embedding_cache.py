@@ -0,0 +1,176 @@
+"""
+Caché persistente de embeddings compartida por la ingestión y las consultas.
+
+Clave: nombre del modelo + tipo (documento/consulta) + sha256 del texto.
+Un LRU en memoria responde primero; detrás hay un SQLite en disco que
+sobrevive entre procesos. El modelo de HuggingFace solo se carga si hay
+algún fallo de caché.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join(PROJECT_ROOT, ".cache", "embeddings.sqlite")
+)
+EMBEDDING_CACHE_LRU_SIZE = int(os.getenv("EMBEDDING_CACHE_LRU_SIZE", "20000"))
+# SQLite limita el número de parámetros por consulta
+_SQL_BATCH = 500
+
+
+class EmbeddingStore:
+    """Almacén SQLite clave -> vector float32."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQL_BATCH):
+                batch = keys[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in items
+                ],
+            )
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(
+        self,
+        model_name,
+        factory=None,
+        path=EMBEDDING_CACHE_PATH,
+        lru_size=EMBEDDING_CACHE_LRU_SIZE,
+    ):
+        self.model_name = model_name
+        self._factory = factory or (lambda: _huggingface_embeddings(model_name))
+        self._model = None
+        self._store = EmbeddingStore(path)
+        self._lru = OrderedDict()
+        self._lru_size = lru_size
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                self._model = self._factory()
+        return self._model
+
+    def _key(self, kind, text):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{kind}:{digest}"
+
+    def _remember(self, key, vector):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._lru_size:
+            self._lru.popitem(last=False)
+
+    def _lookup(self, kind, texts, compute):
+        keys = [self._key(kind, text) for text in texts]
+        vectors = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    vectors[key] = self._lru[key]
+            self.memory_hits += len(vectors)
+
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if pending:
+            from_disk = self._store.get_many(pending)
+            vectors.update(from_disk)
+            with self._lock:
+                self.disk_hits += len(from_disk)
+                for key, vector in from_disk.items():
+                    self._remember(key, vector)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            computed = compute(list(missing.values()))
+            new_items = list(zip(missing.keys(), computed))
+            self._store.put_many(new_items)
+            vectors.update(new_items)
+            with self._lock:
+                self.misses += len(new_items)
+                for key, vector in new_items:
+                    self._remember(key, vector)
+
+        return [vectors[key] for key in keys]
+
+    def embed_documents(self, texts):
+        return self._lookup(
+            "doc", texts, lambda missing: self.model.embed_documents(missing)
+        )
+
+    def embed_query(self, text):
+        return self._lookup(
+            "query", [text], lambda texts: [self.model.embed_query(texts[0])]
+        )[0]
+
+    def stats(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "model": self.model_name,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
+
+
+def _huggingface_embeddings(model_name):
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_embeddings(model_name="all-MiniLM-L6-v2"):
+    """Devuelve la instancia con caché del modelo (una por proceso y modelo)."""
+    with _instances_lock:
+        if model_name not in _instances:
+            _instances[model_name] = CachedEmbeddings(model_name)
+        return _instances[model_name]
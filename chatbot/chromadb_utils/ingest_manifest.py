@@ -0,0 +1,154 @@
+"""
+Manifiesto de ingestión incremental para ChromaDB.
+
+Guarda, por cada archivo de `data/`, el hash de su contenido y los ids de sus
+chunks. Los ids se derivan del contenido del chunk, así que al editar un
+archivo solo se embeben los chunks que realmente cambiaron.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = "ingest_manifest.json"
+MANIFEST_VERSION = 1
+# Máximo de documentos por llamada a Chroma (su límite interno ronda los 5000)
+ADD_BATCH_SIZE = 1000
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_ids(rel_path, chunks):
+    """Ids estables por contenido; los chunks repetidos en un archivo se numeran."""
+    ids = []
+    seen = {}
+    for chunk in chunks:
+        page = chunk.metadata.get("page", "")
+        base = hashlib.sha256(
+            f"{rel_path}\0{page}\0{chunk.page_content}".encode()
+        ).hexdigest()
+        count = seen.get(base, 0)
+        seen[base] = count + 1
+        ids.append(base if count == 0 else f"{base}-{count}")
+    return ids
+
+
+class IngestManifest:
+    def __init__(self, db_path, settings):
+        self.path = os.path.join(db_path, MANIFEST_NAME)
+        self.settings = settings
+        self.files = {}
+        # True si hay un manifiesto previo generado con otra configuración
+        self.outdated = False
+
+    @classmethod
+    def load(cls, db_path, settings):
+        """
+        Carga el manifiesto existente. Si no existe o se generó con otra
+        configuración (modelo, tamaño de chunk...), se devuelve vacío.
+        """
+        manifest = cls(db_path, settings)
+        try:
+            with open(manifest.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if data.get("version") == MANIFEST_VERSION and data.get("settings") == settings:
+            manifest.files = data.get("files", {})
+        else:
+            manifest.outdated = True
+        return manifest
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "settings": self.settings,
+                    "files": self.files,
+                },
+                f,
+                indent=1,
+            )
+        os.replace(tmp_path, self.path)
+
+    def plan(self, current_files):
+        """
+        Compara `{ruta_relativa: ruta_absoluta}` con el manifiesto y devuelve
+        (nuevos_o_modificados, eliminados) junto con los hashes calculados.
+        """
+        changed = {}
+        for rel_path, abs_path in current_files.items():
+            sha = file_sha256(abs_path)
+            if self.files.get(rel_path, {}).get("sha256") != sha:
+                changed[rel_path] = sha
+        removed = [rel_path for rel_path in self.files if rel_path not in current_files]
+        return changed, removed
+
+
+def sync_file(vectorstore, manifest, rel_path, sha, chunks):
+    """
+    Aplica a Chroma la diferencia entre los chunks guardados de un archivo y
+    los nuevos. Devuelve (añadidos, eliminados).
+    """
+    new_ids = chunk_ids(rel_path, chunks)
+    old_ids = set(manifest.files.get(rel_path, {}).get("chunks", []))
+
+    fresh = [
+        (chunk_id, chunk)
+        for chunk_id, chunk in zip(new_ids, chunks)
+        if chunk_id not in old_ids
+    ]
+    for start in range(0, len(fresh), ADD_BATCH_SIZE):
+        batch = fresh[start : start + ADD_BATCH_SIZE]
+        vectorstore.add_documents(
+            [chunk for _, chunk in batch], ids=[chunk_id for chunk_id, _ in batch]
+        )
+
+    return len(fresh), record_file(vectorstore, manifest, rel_path, sha, new_ids)
+
+
+def record_file(vectorstore, manifest, rel_path, sha, new_ids):
+    """
+    Registra los chunks actuales de un archivo (ya guardados en Chroma) y
+    elimina los que dejaron de existir. Devuelve cuántos se eliminaron.
+    """
+    new_id_set = set(new_ids)
+    stale = [
+        chunk_id
+        for chunk_id in manifest.files.get(rel_path, {}).get("chunks", [])
+        if chunk_id not in new_id_set
+    ]
+    if stale:
+        vectorstore.delete(ids=stale)
+
+    manifest.files[rel_path] = {"sha256": sha, "chunks": list(new_ids)}
+    manifest.save()
+    return len(stale)
+
+
+def remove_file(vectorstore, manifest, rel_path):
+    old_ids = manifest.files.pop(rel_path, {}).get("chunks", [])
+    if old_ids:
+        vectorstore.delete(ids=old_ids)
+    manifest.save()
+    return len(old_ids)
+
+
+def find_files(data_path, extensions):
+    """Devuelve `{ruta_relativa: ruta_absoluta}` de los archivos a ingerir."""
+    found = {}
+    for root, _, files in os.walk(data_path):
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                abs_path = os.path.join(root, name)
+                found[os.path.relpath(abs_path, data_path)] = abs_path
+    return found
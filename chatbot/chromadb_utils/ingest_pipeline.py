@@ -0,0 +1,217 @@
+"""
+Pipeline de ingestión en streaming:
+
+    procesos (parseo + chunking por página) -> cola acotada -> hilo de embeddings
+    (lotes fijos) -> cola acotada -> hilo de upserts a Chroma (lotes)
+
+La memoria queda acotada por el tamaño de las colas y el número de tareas en
+vuelo, no por el tamaño del corpus.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from langchain_core.documents import Document
+
+from chatbot.chromadb_utils.ingest_manifest import chunk_ids
+
+PDF_PAGES_PER_TASK = 8
+_DONE = object()
+
+
+def plan_tasks(files):
+    """
+    Divide los archivos en tareas de parseo: los PDF en bloques de páginas,
+    los Markdown completos. `files` es `{ruta_relativa: ruta_absoluta}`.
+    """
+    from pypdf import PdfReader
+
+    tasks = []
+    for rel_path, abs_path in files.items():
+        if abs_path.lower().endswith(".pdf"):
+            total = len(PdfReader(abs_path).pages)
+            for start in range(0, total, PDF_PAGES_PER_TASK):
+                tasks.append((rel_path, abs_path, start, min(start + PDF_PAGES_PER_TASK, total)))
+        else:
+            tasks.append((rel_path, abs_path, 0, 1))
+    return tasks
+
+
+def parse_task(task, chunk_size, chunk_overlap):
+    """
+    Se ejecuta en un proceso hijo. Devuelve (ruta_relativa, páginas, chunks)
+    con los chunks como tuplas (id, texto, metadatos).
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    rel_path, abs_path, start, end = task
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+
+    if abs_path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        reader = PdfReader(abs_path)
+        pages = [
+            Document(
+                page_content=reader.pages[i].extract_text() or "",
+                metadata={"source": abs_path, "page": i, "total_pages": len(reader.pages)},
+            )
+            for i in range(start, end)
+        ]
+    else:
+        from langchain_community.document_loaders import \
+            UnstructuredMarkdownLoader
+
+        pages = UnstructuredMarkdownLoader(abs_path).load()
+
+    chunks = splitter.split_documents(pages)
+    ids = chunk_ids(rel_path, chunks)
+    return (
+        rel_path,
+        len(pages),
+        [(i, c.page_content, c.metadata) for i, c in zip(ids, chunks)],
+    )
+
+
+class IngestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.pages = 0
+        self.chunks = 0
+        self.skipped = 0
+        self.embedded = 0
+        self.upserted = 0
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (
+            f"{self.pages} páginas ({self.pages / elapsed:.1f}/s), "
+            f"{self.chunks} chunks ({self.chunks / elapsed:.1f}/s), "
+            f"{self.embedded} embeddings ({self.embedded / elapsed:.1f}/s), "
+            f"{self.skipped} sin cambios, {self.upserted} guardados en {elapsed:.1f}s"
+        )
+
+
+def run_pipeline(
+    tasks,
+    embeddings,
+    collection,
+    skip_ids=frozenset(),
+    chunk_size=1000,
+    chunk_overlap=200,
+    workers=None,
+    batch_size=64,
+    upsert_batch_size=512,
+    queue_size=1024,
+):
+    """
+    Ejecuta el pipeline y devuelve ({ruta_relativa: [ids]}, stats).
+    Los chunks cuyo id está en `skip_ids` ya existen en Chroma y no se embeben.
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = IngestStats()
+    file_ids = {}
+    errors = []
+
+    chunk_queue = queue.Queue(maxsize=queue_size)
+    upsert_queue = queue.Queue(maxsize=max(2, queue_size // batch_size))
+
+    def embed_worker():
+        batch = []
+
+        def flush():
+            vectors = embeddings.embed_documents([text for _, text, _ in batch])
+            stats.embedded += len(batch)
+            upsert_queue.put((batch, vectors))
+
+        try:
+            while (item := chunk_queue.get()) is not _DONE:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    flush()
+                    batch = []
+            if batch:
+                flush()
+        except Exception as e:
+            errors.append(e)
+            # Vaciar la cola para que el productor no se bloquee
+            while chunk_queue.get() is not _DONE:
+                pass
+        finally:
+            upsert_queue.put(_DONE)
+
+    def upsert_worker():
+        pending = []
+
+        def flush():
+            collection.upsert(
+                ids=[chunk_id for chunk_id, _, _, _ in pending],
+                embeddings=[vector for _, _, _, vector in pending],
+                documents=[text for _, text, _, _ in pending],
+                metadatas=[metadata for _, _, metadata, _ in pending],
+            )
+            stats.upserted += len(pending)
+
+        try:
+            while (item := upsert_queue.get()) is not _DONE:
+                batch, vectors = item
+                pending.extend(
+                    (chunk_id, text, metadata, vector)
+                    for (chunk_id, text, metadata), vector in zip(batch, vectors)
+                )
+                if len(pending) >= upsert_batch_size:
+                    flush()
+                    pending = []
+            if pending:
+                flush()
+        except Exception as e:
+            errors.append(e)
+            while upsert_queue.get() is not _DONE:
+                pass
+
+    threads = [
+        threading.Thread(target=embed_worker, name="ingest-embed", daemon=True),
+        threading.Thread(target=upsert_worker, name="ingest-upsert", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            remaining = iter(tasks)
+            in_flight = set()
+            # Se limita el número de tareas en vuelo para acotar la memoria
+            max_in_flight = workers * 2
+            while True:
+                for task in remaining:
+                    in_flight.add(executor.submit(parse_task, task, chunk_size, chunk_overlap))
+                    if len(in_flight) >= max_in_flight:
+                        break
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_path, pages, chunks = future.result()
+                    stats.pages += pages
+                    stats.chunks += len(chunks)
+                    file_ids.setdefault(rel_path, []).extend(i for i, _, _ in chunks)
+                    for chunk in chunks:
+                        if chunk[0] in skip_ids:
+                            stats.skipped += 1
+                        else:
+                            chunk_queue.put(chunk)
+                if errors:
+                    break
+    finally:
+        chunk_queue.put(_DONE)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return file_ids, stats
@@ -1,10 +1,15 @@
 import os
 
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 
+from chatbot.chromadb_utils.embedding_cache import get_embeddings
+from chatbot.chromadb_utils.numpy_index import (NUMPY_INDEX_PATH, NumpyIndex,
+                                                NumpyRetriever)
+from chatbot.chromadb_utils.sparse_index import (SPARSE_INDEX_PATH,
+                                                 HybridRetriever, SparseIndex)
 
-def load_vectorstore():
+
+def load_vectorstore(search_kwargs=None):
     current_dir = os.path.dirname(os.path.abspath(__file__))
     db_path = os.path.abspath(os.path.join(current_dir, "..", "..", "chroma_db"))
 
@@ -12,7 +17,7 @@ def load_vectorstore():
         print("ERROR: La carpeta de base de datos no existe en la ruta calculada.")
         return None
 
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    embeddings = get_embeddings("all-MiniLM-L6-v2")
 
     vectorstore = Chroma(
         persist_directory=db_path,
@@ -26,5 +31,43 @@ def load_vectorstore():
     if cantidad == 0:
         print("ALERTA: La base de datos está vacía (o estás apuntando al lugar incorrecto).")
     
-    retriever = vectorstore.as_retriever()
-    return retriever
\ No newline at end of file
+    retriever = vectorstore.as_retriever(search_kwargs=search_kwargs or {})
+    return retriever
+
+
+def load_numpy_retriever(k=4):
+    """Retriever sobre el índice NumPy exportado desde Chroma (RETRIEVER_BACKEND=numpy)."""
+    if not os.path.exists(os.path.join(NUMPY_INDEX_PATH, "meta.json")):
+        print("ERROR: No existe el índice NumPy. Expórtalo con chatbot.chromadb_utils.numpy_index")
+        return None
+
+    index = NumpyIndex(NUMPY_INDEX_PATH)
+    print(f"   -> Documentos en índice NumPy: {len(index)} ({index.meta['dtype']})")
+    return NumpyRetriever(
+        index=index, embeddings=get_embeddings(index.meta["model"]), k=k
+    )
+
+
+def load_hybrid_retriever(dense_backend="chroma", fetch_k=10):
+    """BM25 + retriever denso fusionados (RETRIEVER_BACKEND=hybrid)."""
+    if not os.path.exists(os.path.join(SPARSE_INDEX_PATH, "postings.npz")):
+        print("ERROR: No existe el índice BM25. Créalo con chatbot.chromadb_utils.sparse_index")
+        return None
+
+    sparse = SparseIndex(SPARSE_INDEX_PATH)
+    print(f"   -> Documentos en índice BM25: {len(sparse)}")
+    if dense_backend == "numpy":
+        dense = load_numpy_retriever(k=fetch_k)
+    elif dense_backend == "none":
+        dense = None
+    else:
+        dense = load_vectorstore(search_kwargs={"k": fetch_k})
+    return HybridRetriever(sparse=sparse, dense=dense, fetch_k=fetch_k)
+
+
+def load_retriever(backend="chroma"):
+    if backend == "numpy":
+        return load_numpy_retriever()
+    if backend == "hybrid":
+        return load_hybrid_retriever(os.getenv("HYBRID_DENSE_BACKEND", "chroma"))
+    return load_vectorstore()
@@ -0,0 +1,276 @@
+"""
+Índice vectorial en memoria con NumPy, exportado desde la colección de Chroma.
+
+    numpy_index/
+    ├── vectors.npy     # matriz (n, dim) float32/float16/int8 normalizada, se abre con mmap
+    ├── scales.npy      # solo int8: factor de escala por vector
+    ├── rerank.npy      # opcional con int8: copia float16 para re-ordenar candidatos
+    ├── chunks.jsonl    # texto y metadatos de cada fila, en el mismo orden
+    └── meta.json       # modelo, dtype, número de filas
+
+Exportar (después de cada ingestión):
+
+    uv run python -m chatbot.chromadb_utils.numpy_index --dtype float16
+    uv run python -m chatbot.chromadb_utils.numpy_index --dtype int8 --rerank
+
+Se activa en el chat con RETRIEVER_BACKEND=numpy.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+CHROMA_DB_PATH = os.path.join(PROJECT_ROOT, "chroma_db")
+NUMPY_INDEX_PATH = os.getenv(
+    "NUMPY_INDEX_PATH", os.path.join(PROJECT_ROOT, "numpy_index")
+)
+EXPORT_PAGE_SIZE = 1000
+# Filas por bloque al buscar: acota la memoria temporal al convertir a float32
+SEARCH_BLOCK_ROWS = 8192
+# Con re-ranking, candidatos cuantizados evaluados por cada resultado pedido
+RERANK_FACTOR = int(os.getenv("NUMPY_INDEX_RERANK_FACTOR", "4"))
+# Reintentos al abrir el índice mientras se sustituye por una exportación nueva
+LOAD_RETRIES = 10
+LOAD_RETRY_DELAY = 0.1
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_int8(matrix):
+    """
+    Cuantización simétrica por vector: v ≈ q * scale, con q en [-127, 127].
+    Devuelve (q int8, scales float32).
+    """
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def export_from_chroma(
+    db_path=CHROMA_DB_PATH,
+    out_path=NUMPY_INDEX_PATH,
+    dtype="float32",
+    model_name="all-MiniLM-L6-v2",
+    rerank=False,
+):
+    """Vuelca los embeddings, textos y metadatos de Chroma al formato del índice."""
+    from langchain_chroma import Chroma
+
+    collection = Chroma(persist_directory=db_path)._collection
+    total = collection.count()
+
+    ids, vectors, rows = [], [], []
+    for offset in range(0, total, EXPORT_PAGE_SIZE):
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=EXPORT_PAGE_SIZE,
+            offset=offset,
+        )
+        ids.extend(page["ids"])
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        rows.extend(zip(page["ids"], page["documents"], page["metadatas"]))
+
+    if not ids:
+        raise ValueError(f"La colección de {db_path} está vacía")
+
+    matrix = _normalize(np.concatenate(vectors))
+    write_index(out_path, matrix, rows, dtype, model_name, rerank)
+    return matrix.shape
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def write_index(out_path, matrix, rows, dtype, model_name, rerank=False):
+    """
+    Escribe el índice a partir de una matriz float32 normalizada y sus filas.
+
+    Los ficheros se generan en un directorio temporal y sustituyen a los
+    anteriores con `os.replace`: un proceso con el índice abierto en mmap sigue
+    leyendo el inodo antiguo. Durante la sustitución meta.json indica
+    "updating" y cada exportación lleva un `export_id` nuevo, para que
+    `NumpyIndex` no mezcle ficheros de dos exportaciones.
+    """
+    os.makedirs(out_path, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=out_path)
+    try:
+        if dtype == "int8":
+            quantized, scales = quantize_int8(matrix)
+            arrays = {"vectors.npy": quantized, "scales.npy": scales}
+            if rerank:
+                arrays["rerank.npy"] = matrix.astype(np.float16)
+        else:
+            arrays = {"vectors.npy": matrix.astype(dtype)}
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, name), array)
+
+        with open(os.path.join(tmp_path, "chunks.jsonl"), "w", encoding="utf-8") as f:
+            for chunk_id, text, metadata in rows:
+                f.write(
+                    json.dumps(
+                        {"id": chunk_id, "text": text, "metadata": metadata or {}},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+
+        meta_path = os.path.join(out_path, "meta.json")
+        _write_json(meta_path, {"updating": True})
+        for name in list(arrays) + ["chunks.jsonl"]:
+            os.replace(os.path.join(tmp_path, name), os.path.join(out_path, name))
+        # Ficheros de un formato anterior (p. ej. de int8 a float16)
+        for name in ("scales.npy", "rerank.npy"):
+            if name not in arrays and os.path.exists(os.path.join(out_path, name)):
+                os.remove(os.path.join(out_path, name))
+        _write_json(
+            meta_path,
+            {
+                "model": model_name,
+                "dtype": dtype,
+                "rerank": bool(rerank and dtype == "int8"),
+                "rows": int(matrix.shape[0]),
+                "dim": int(matrix.shape[1]),
+                "export_id": uuid.uuid4().hex,
+            },
+        )
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _top_k(scores, k):
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class NumpyIndex:
+    def __init__(self, path=NUMPY_INDEX_PATH, rerank=None):
+        # Si una exportación sustituye los ficheros mientras se cargan, se repite
+        for _ in range(LOAD_RETRIES):
+            meta = self._read_meta(path)
+            if not meta.get("updating"):
+                self.meta = meta
+                self._load(path, rerank)
+                consistent = len(self.vectors) == len(self.chunks) == meta["rows"]
+                if consistent and self._read_meta(path) == meta:
+                    return
+            time.sleep(LOAD_RETRY_DELAY)
+        raise ValueError(f"El índice de {path} se está reescribiendo, inténtalo de nuevo")
+
+    @staticmethod
+    def _read_meta(path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load(self, path, rerank):
+        # mmap: la carga es casi instantánea y las páginas se comparten entre procesos
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.scales = None
+        self.rerank_vectors = None
+        if self.meta["dtype"] == "int8":
+            self.scales = np.load(os.path.join(path, "scales.npy"))
+            use_rerank = self.meta.get("rerank", False) if rerank is None else rerank
+            if use_rerank and os.path.exists(os.path.join(path, "rerank.npy")):
+                self.rerank_vectors = np.load(
+                    os.path.join(path, "rerank.npy"), mmap_mode="r"
+                )
+        with open(os.path.join(path, "chunks.jsonl"), encoding="utf-8") as f:
+            self.chunks = [json.loads(line) for line in f]
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def nbytes(self):
+        """Bytes de los vectores que participan en cada búsqueda completa."""
+        total = self.vectors.nbytes
+        if self.scales is not None:
+            total += self.scales.nbytes
+        return total
+
+    def _scores(self, query):
+        # Por bloques: float16/int8 se convierten a float32 sin copiar toda la matriz
+        scores = np.empty(len(self.vectors), dtype=np.float32)
+        for start in range(0, len(self.vectors), SEARCH_BLOCK_ROWS):
+            block = self.vectors[start : start + SEARCH_BLOCK_ROWS]
+            scores[start : start + len(block)] = block.astype(np.float32, copy=False) @ query
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def search(self, query_vector, k=4):
+        """Devuelve (índices, similitudes coseno) de los k vectores más parecidos."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self._scores(query)
+
+        if self.rerank_vectors is None:
+            top = _top_k(scores, k)
+            return top, scores[top]
+
+        # Re-ranking: se recalculan en float solo los mejores candidatos int8
+        candidates = np.sort(_top_k(scores, k * RERANK_FACTOR))
+        exact = self.rerank_vectors[candidates].astype(np.float32) @ query
+        order = _top_k(exact, k)
+        return candidates[order], exact[order]
+
+    def document(self, row, score=None):
+        chunk = self.chunks[row]
+        metadata = dict(chunk["metadata"])
+        if score is not None:
+            metadata["score"] = float(score)
+        return Document(id=chunk["id"], page_content=chunk["text"], metadata=metadata)
+
+
+class NumpyRetriever(BaseRetriever):
+    """Retriever de LangChain sobre `NumpyIndex`, compatible con create_retrieval_chain."""
+
+    index: NumpyIndex
+    embeddings: Embeddings
+    k: int = 4
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        rows, scores = self.index.search(self.embeddings.embed_query(query), self.k)
+        return [self.index.document(row, score) for row, score in zip(rows, scores)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--dtype", choices=["float32", "float16", "int8"], default="float32"
+    )
+    parser.add_argument(
+        "--rerank",
+        action="store_true",
+        help="Con int8, guarda una copia float16 para re-ordenar los candidatos",
+    )
+    parser.add_argument("--db-path", default=CHROMA_DB_PATH)
+    parser.add_argument("--out", default=NUMPY_INDEX_PATH)
+    args = parser.parse_args()
+
+    rows, dim = export_from_chroma(
+        args.db_path, args.out, args.dtype, rerank=args.rerank
+    )
+    print(f"Índice exportado a {args.out}: {rows} vectores de {dim} dimensiones ({args.dtype}).")
@@ -0,0 +1,170 @@
+"""
+Caché de consultas delante del retriever del chat.
+
+Las preguntas se normalizan (minúsculas, sin tildes ni signos, espacios
+colapsados) para que "¿Qué es la depresión?" y "que es la depresion" compartan
+entrada. Una reingestión escribe un marcador de versión junto a la base; al
+detectarlo se vacía la caché y, si se pasó `reload`, se vuelve a abrir el
+retriever (los índices NumPy y BM25 se cargan en memoria y no ven los cambios).
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from chatbot.core.text_utils import fold_accents
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+INDEX_VERSION_FILE = os.path.join(PROJECT_ROOT, "chroma_db", ".index_version")
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "512"))
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", "3600"))
+# Cada cuánto (segundos) se mira el marcador de versión como máximo
+VERSION_CHECK_INTERVAL = 2.0
+
+_non_word_re = re.compile(r"[^a-z0-9ñ]+")
+
+
+def normalize_query(query):
+    return _non_word_re.sub(" ", fold_accents(query)).strip()
+
+
+def bump_index_version(path=INDEX_VERSION_FILE):
+    """La llama la ingestión al terminar para invalidar las cachés de consultas."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(str(time.time_ns()))
+
+
+def _read_index_version(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class CachedRetriever(BaseRetriever):
+    retriever: BaseRetriever
+    max_size: int = RETRIEVAL_CACHE_SIZE
+    ttl: float = RETRIEVAL_CACHE_TTL
+    version_file: str = INDEX_VERSION_FILE
+    # Crea un retriever nuevo sobre el índice actual; None si lee del disco en cada consulta
+    reload: Callable[[], BaseRetriever | None] | None = None
+
+    _entries: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _version: str | None = PrivateAttr(default=None)
+    _version_checked_at: float | None = PrivateAttr(default=None)
+    # Sube con cada vaciado: una consulta empezada antes no guarda su resultado
+    _generation: int = PrivateAttr(default=0)
+    _reloading: bool = PrivateAttr(default=False)
+    _stats: dict = PrivateAttr(
+        default_factory=lambda: {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "reloads": 0,
+            "reload_errors": 0,
+        }
+    )
+
+    def _invalidate(self):
+        if self._entries:
+            self._stats["invalidations"] += 1
+        self._entries.clear()
+        self._generation += 1
+
+    def _check_version(self, now):
+        """Vacía la caché si cambió el índice; devuelve la versión a recargar o None."""
+        first_check = self._version_checked_at is None
+        if self._reloading:
+            return None
+        if not first_check and now - self._version_checked_at < VERSION_CHECK_INTERVAL:
+            return None
+        self._version_checked_at = now
+        version = _read_index_version(self.version_file)
+        if version == self._version:
+            return None
+        self._invalidate()
+        # El retriever recibido ya se abrió sobre el índice actual
+        if first_check or self.reload is None:
+            self._version = version
+            return None
+        self._reloading = True
+        return version
+
+    def _reload(self, version):
+        try:
+            retriever = self.reload()
+            if retriever is None:
+                raise RuntimeError("el índice no existe")
+        except Exception as e:
+            print(f"⚠️ No se pudo recargar el índice, se sigue con el anterior: {e}")
+            retriever = None
+
+        with self._lock:
+            self._reloading = False
+            if retriever is None:
+                # `_version` no avanza: se reintenta en la siguiente comprobación
+                self._stats["reload_errors"] += 1
+                return
+            self.retriever = retriever
+            self._version = version
+            # Lo guardado durante la recarga salió del índice anterior
+            self._invalidate()
+            self._stats["reloads"] += 1
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        key = normalize_query(query)
+        now = time.monotonic()
+
+        with self._lock:
+            pending_version = self._check_version(now)
+        # Fuera del lock: abrir el índice tarda y las demás consultas siguen con el anterior
+        if pending_version is not None:
+            self._reload(pending_version)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return list(entry[1])
+            self._stats["misses"] += 1
+            generation = self._generation
+
+        documents = self.retriever.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now, documents)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return list(documents)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,276 @@
+"""
+Índice invertido BM25 para español y retriever híbrido (BM25 + denso).
+
+    sparse_index/
+    ├── postings.npz    # CSR: indptr por término, doc_ids int32, tfs uint16, doc_len
+    ├── terms.json      # vocabulario (raíces), en el orden de indptr
+    ├── chunks.jsonl    # texto y metadatos de cada documento
+    └── meta.json       # documentos, términos y export_id
+
+Construir (después de cada ingestión):
+
+    uv run python -m chatbot.chromadb_utils.sparse_index
+
+Se activa en el chat con RETRIEVER_BACKEND=hybrid.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from nltk.stem.snowball import SnowballStemmer
+
+from chatbot.chromadb_utils.numpy_index import (LOAD_RETRIES, LOAD_RETRY_DELAY,
+                                                _write_json)
+from chatbot.core.text_utils import fold_accents
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+CHROMA_DB_PATH = os.path.join(PROJECT_ROOT, "chroma_db")
+SPARSE_INDEX_PATH = os.getenv(
+    "SPARSE_INDEX_PATH", os.path.join(PROJECT_ROOT, "sparse_index")
+)
+HYBRID_SPARSE_ONLY_MAX_TERMS = int(os.getenv("HYBRID_SPARSE_ONLY_MAX_TERMS", "2"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Palabras vacías sin tildes (se comparan después de normalizar)
+STOPWORDS = frozenset(
+    """
+    a al algo algun alguna algunas alguno algunos ante antes aqui asi aun bien cada como con
+    contra cual cuales cuando de del desde donde dos e el ella ellas ello ellos en entre era
+    eran es esa esas ese eso esos esta estaba estan estar estas este esto estos fue fueron ha
+    hace hacer hacia han has hasta hay la las le les lo los mas me mi mis mucho muy nada ni no
+    nos nosotros o os otra otras otro otros para pero poco por porque puede que quien se sea
+    ser si sin sobre solo son su sus tambien tan te tener tiene tienen todo todos tu tus un una
+    uno unos usted ustedes y ya yo
+    """.split()
+)
+
+_stemmer = SnowballStemmer("spanish")
+_word_re = re.compile(r"[a-z0-9ñ]+")
+
+
+@lru_cache(maxsize=100_000)
+def _stem(word):
+    return _stemmer.stem(word)
+
+
+def tokenize(text):
+    return [
+        _stem(word)
+        for word in _word_re.findall(fold_accents(text))
+        if word not in STOPWORDS and len(word) > 1
+    ]
+
+
+def build_index(chunks, out_path=SPARSE_INDEX_PATH):
+    """
+    `chunks` es una lista de (id, texto, metadatos).
+
+    Igual que `numpy_index.write_index`: se escribe en un directorio temporal,
+    se sustituye con `os.replace` y meta.json marca "updating" mientras tanto.
+    """
+    postings = {}
+    doc_len = np.zeros(len(chunks), dtype=np.uint32)
+    for doc_id, (_, text, _) in enumerate(chunks):
+        counts = Counter(tokenize(text))
+        doc_len[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = sorted(postings)
+    indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(postings[t]) for t in terms])
+    doc_ids = np.empty(indptr[-1], dtype=np.int32)
+    tfs = np.empty(indptr[-1], dtype=np.uint16)
+    for i, term in enumerate(terms):
+        entries = np.asarray(postings[term])
+        doc_ids[indptr[i] : indptr[i + 1]] = entries[:, 0]
+        tfs[indptr[i] : indptr[i + 1]] = np.minimum(entries[:, 1], np.iinfo(np.uint16).max)
+
+    os.makedirs(out_path, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=out_path)
+    try:
+        np.savez(
+            os.path.join(tmp_path, "postings.npz"),
+            indptr=indptr,
+            doc_ids=doc_ids,
+            tfs=tfs,
+            doc_len=doc_len,
+        )
+        with open(os.path.join(tmp_path, "terms.json"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+        with open(os.path.join(tmp_path, "chunks.jsonl"), "w", encoding="utf-8") as f:
+            for chunk_id, text, metadata in chunks:
+                f.write(
+                    json.dumps(
+                        {"id": chunk_id, "text": text, "metadata": metadata or {}},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+
+        meta_path = os.path.join(out_path, "meta.json")
+        _write_json(meta_path, {"updating": True})
+        for name in ("postings.npz", "terms.json", "chunks.jsonl"):
+            os.replace(os.path.join(tmp_path, name), os.path.join(out_path, name))
+        _write_json(
+            meta_path,
+            {"docs": len(chunks), "terms": len(terms), "export_id": uuid.uuid4().hex},
+        )
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return len(chunks), len(terms)
+
+
+def build_from_chroma(db_path=CHROMA_DB_PATH, out_path=SPARSE_INDEX_PATH):
+    from langchain_chroma import Chroma
+
+    data = Chroma(persist_directory=db_path)._collection.get(
+        include=["documents", "metadatas"]
+    )
+    chunks = list(zip(data["ids"], data["documents"], data["metadatas"]))
+    if not chunks:
+        raise ValueError(f"La colección de {db_path} está vacía")
+    return build_index(chunks, out_path)
+
+
+class SparseIndex:
+    def __init__(self, path=SPARSE_INDEX_PATH):
+        # Si una reconstrucción sustituye los ficheros mientras se cargan, se repite
+        for _ in range(LOAD_RETRIES):
+            meta = self._read_meta(path)
+            if not meta.get("updating"):
+                self._load(path)
+                if self._consistent(meta) and self._read_meta(path) == meta:
+                    break
+            time.sleep(LOAD_RETRY_DELAY)
+        else:
+            raise ValueError(f"El índice de {path} se está reescribiendo, inténtalo de nuevo")
+
+        n_docs = len(self.doc_len)
+        df = np.diff(self.indptr).astype(np.float32)
+        self.idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        self.avg_len = float(self.doc_len.mean()) if n_docs else 0.0
+
+    @staticmethod
+    def _read_meta(path):
+        # Los índices construidos antes de meta.json se cargan sin comprobaciones
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _load(self, path):
+        data = np.load(os.path.join(path, "postings.npz"))
+        self.indptr = data["indptr"]
+        self.doc_ids = data["doc_ids"]
+        self.tfs = data["tfs"].astype(np.float32)
+        self.doc_len = data["doc_len"].astype(np.float32)
+        with open(os.path.join(path, "terms.json"), encoding="utf-8") as f:
+            self.term_ids = {term: i for i, term in enumerate(json.load(f))}
+        with open(os.path.join(path, "chunks.jsonl"), encoding="utf-8") as f:
+            self.chunks = [json.loads(line) for line in f]
+
+    def _consistent(self, meta):
+        n_terms = len(self.indptr) - 1
+        if len(self.doc_len) != len(self.chunks) or len(self.term_ids) != n_terms:
+            return False
+        return not meta or (meta["docs"] == len(self.chunks) and meta["terms"] == n_terms)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def search(self, query, k=4):
+        """Devuelve (índices, puntuaciones BM25) ordenados; vacío si no hay coincidencias."""
+        term_ids = [self.term_ids[t] for t in set(tokenize(query)) if t in self.term_ids]
+        if not term_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = np.zeros(len(self.doc_len), dtype=np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len / self.avg_len)
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end]
+            scores[docs] += self.idf[term_id] * tf * (BM25_K1 + 1) / (tf + norm[docs])
+
+        matched = np.flatnonzero(scores)
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def document(self, row, score=None):
+        chunk = self.chunks[row]
+        metadata = dict(chunk["metadata"])
+        if score is not None:
+            metadata["bm25"] = float(score)
+        return Document(id=chunk["id"], page_content=chunk["text"], metadata=metadata)
+
+
+def _doc_key(document):
+    return document.id or document.page_content
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Fusiona BM25 y un retriever denso con Reciprocal Rank Fusion. Las
+    consultas cortas (pocos términos útiles) usan solo BM25 y no embeben nada.
+    """
+
+    sparse: SparseIndex
+    dense: BaseRetriever | None = None
+    k: int = 4
+    fetch_k: int = 10
+    rrf_k: int = 60
+    sparse_only_max_terms: int = HYBRID_SPARSE_ONLY_MAX_TERMS
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        rows, scores = self.sparse.search(query, self.fetch_k)
+        sparse_docs = [self.sparse.document(r, s) for r, s in zip(rows, scores)]
+
+        short_query = len(tokenize(query)) <= self.sparse_only_max_terms
+        if self.dense is None or (short_query and sparse_docs):
+            return sparse_docs[: self.k]
+
+        dense_docs = self.dense.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+
+        fused = {}
+        documents = {}
+        for ranking in (sparse_docs, dense_docs):
+            for rank, document in enumerate(ranking):
+                key = _doc_key(document)
+                fused[key] = fused.get(key, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                documents.setdefault(key, document)
+
+        best = sorted(fused, key=fused.get, reverse=True)[: self.k]
+        return [documents[key] for key in best]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-path", default=CHROMA_DB_PATH)
+    parser.add_argument("--out", default=SPARSE_INDEX_PATH)
+    args = parser.parse_args()
+
+    n_docs, n_terms = build_from_chroma(args.db_path, args.out)
+    print(f"Índice BM25 creado en {args.out}: {n_docs} documentos, {n_terms} términos.")
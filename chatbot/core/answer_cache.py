@@ -0,0 +1,295 @@
+"""
+Caché semántica de respuestas delante de la llamada a Gemini de `rag_chain`.
+
+La pregunta se embebe y se compara (coseno) con las ya respondidas dentro del
+mismo grupo de contexto: una huella de unos pocos campos del contexto del
+usuario (nombre, edad por décadas, estado de ánimo...). Si el contexto no
+tiene ninguno de esos campos no hay grupo y la caché no se usa: así una
+respuesta personalizada no se sirve a otro usuario.
+
+    ANSWER_CACHE_BACKEND=memory | redis | none
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from chatbot.chromadb_utils.embedding_cache import get_embeddings
+from chatbot.core.text_utils import fold_accents
+
+ANSWER_CACHE_BACKEND = os.getenv("ANSWER_CACHE_BACKEND", "memory")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", str(60 * 60 * 24)))
+ANSWER_CACHE_CONTEXT_FIELDS = [
+    field.strip()
+    for field in os.getenv("ANSWER_CACHE_CONTEXT_FIELDS", "nombre,edad,estado_animo").split(",")
+    if field.strip()
+]
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+def _coarse_value(field, value):
+    if field == "edad":
+        try:
+            return str(int(float(value)) // 10 * 10)
+        except (TypeError, ValueError):
+            pass
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return " ".join(fold_accents(str(value)).split())
+
+
+def context_fingerprint(user_context, fields=None):
+    """
+    Huella corta de los campos relevantes del contexto (dict o JSON en texto).
+    None si no hay ninguno: sin ellos todos los contextos compartirían grupo.
+    """
+    fields = ANSWER_CACHE_CONTEXT_FIELDS if fields is None else fields
+    if isinstance(user_context, str):
+        try:
+            user_context = json.loads(user_context)
+        except ValueError:
+            user_context = None
+    user_context = user_context if isinstance(user_context, dict) else {}
+
+    coarse = {
+        field: _coarse_value(field, user_context[field])
+        for field in fields
+        if user_context.get(field) not in (None, "")
+    }
+    if not coarse:
+        return None
+    payload = json.dumps(coarse, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+class InMemoryAnswerStore:
+    """LRU global con TTL; las entradas se agrupan por huella de contexto."""
+
+    def __init__(self, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._buckets = {}
+        self._order = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _drop(self, fingerprint, entry_id):
+        bucket = self._buckets.get(fingerprint, {})
+        bucket.pop(entry_id, None)
+        if not bucket:
+            self._buckets.pop(fingerprint, None)
+        self._order.pop((fingerprint, entry_id), None)
+
+    def search(self, fingerprint, vector):
+        """Devuelve (similitud, respuesta) de la entrada más parecida, o None."""
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(fingerprint)
+            if not bucket:
+                return None
+            for entry_id, entry in list(bucket.items()):
+                if now - entry["created"] > self.ttl:
+                    self._drop(fingerprint, entry_id)
+            if not bucket:
+                return None
+
+            ids = list(bucket)
+            scores = np.stack([bucket[i]["vector"] for i in ids]) @ vector
+            best = int(np.argmax(scores))
+            self._order.move_to_end((fingerprint, ids[best]))
+            return float(scores[best]), bucket[ids[best]]["answer"]
+
+    def add(self, fingerprint, vector, question, answer):
+        entry_id = uuid.uuid4().hex
+        with self._lock:
+            self._buckets.setdefault(fingerprint, {})[entry_id] = {
+                "vector": vector,
+                "question": question,
+                "answer": answer,
+                "created": time.time(),
+            }
+            self._order[(fingerprint, entry_id)] = None
+            while len(self._order) > self.max_entries:
+                (old_fp, old_id), _ = self._order.popitem(last=False)
+                self._drop(old_fp, old_id)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._order.clear()
+
+    def size(self):
+        return len(self._order)
+
+
+class RedisAnswerStore:
+    """
+    Un hash por huella (`answer_cache:<huella>`) y un sorted set con la fecha
+    de cada entrada para desalojar las más antiguas. La TTL se aplica al grupo.
+    """
+
+    PREFIX = "answer_cache"
+
+    def __init__(self, client=None, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL):
+        if client is None:
+            from chatbot.core.redis_client import redis_client as client
+        self.client = client
+        # Límite por grupo de contexto: el total lo acota la TTL
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+
+    def _keys(self, fingerprint):
+        base = f"{self.PREFIX}:{fingerprint}"
+        return base, f"{base}:order"
+
+    def search(self, fingerprint, vector):
+        entries_key, _ = self._keys(fingerprint)
+        raw = self.client.hgetall(entries_key)
+        if not raw:
+            return None
+
+        answers, vectors = [], []
+        for value in raw.values():
+            entry = json.loads(value)
+            answers.append(entry["answer"])
+            vectors.append(np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32))
+        scores = np.stack(vectors) @ vector
+        best = int(np.argmax(scores))
+        return float(scores[best]), answers[best]
+
+    def add(self, fingerprint, vector, question, answer):
+        entries_key, order_key = self._keys(fingerprint)
+        entry_id = uuid.uuid4().hex
+        value = json.dumps(
+            {
+                "question": question,
+                "answer": answer,
+                "vector": base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii"),
+            },
+            ensure_ascii=False,
+        )
+
+        pipe = self.client.pipeline()
+        pipe.hset(entries_key, entry_id, value)
+        pipe.zadd(order_key, {entry_id: time.time()})
+        pipe.expire(entries_key, self.ttl)
+        pipe.expire(order_key, self.ttl)
+        pipe.zcard(order_key)
+        size = pipe.execute()[-1]
+
+        overflow = size - self.max_entries
+        if overflow > 0:
+            oldest = self.client.zrange(order_key, 0, overflow - 1)
+            if oldest:
+                pipe = self.client.pipeline()
+                pipe.hdel(entries_key, *oldest)
+                pipe.zrem(order_key, *oldest)
+                pipe.execute()
+                self.evictions += len(oldest)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.PREFIX}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def size(self):
+        return sum(
+            self.client.zcard(key)
+            for key in self.client.scan_iter(f"{self.PREFIX}:*:order")
+        )
+
+
+class SemanticAnswerCache:
+    def __init__(self, store, embeddings=None, threshold=ANSWER_CACHE_THRESHOLD):
+        self.store = store
+        self._embeddings = embeddings
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # Consultas sin campos de contexto: no se cachean
+        self.skipped = 0
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = get_embeddings(EMBEDDING_MODEL)
+        return self._embeddings
+
+    def _vector(self, question):
+        return _unit(self.embeddings.embed_query(" ".join(question.lower().split())))
+
+    def lookup(self, question, user_context):
+        """Respuesta guardada para una pregunta equivalente, o None."""
+        fingerprint = context_fingerprint(user_context)
+        if fingerprint is None:
+            with self._lock:
+                self.skipped += 1
+            return None
+        try:
+            match = self.store.search(fingerprint, self._vector(question))
+        except Exception as e:
+            # La caché nunca debe tumbar el chat (p. ej. Redis caído)
+            print(f"⚠️ Caché de respuestas no disponible: {e}")
+            match = None
+            with self._lock:
+                self.errors += 1
+
+        hit = match is not None and match[0] >= self.threshold
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return match[1] if hit else None
+
+    def store_answer(self, question, user_context, answer):
+        fingerprint = context_fingerprint(user_context)
+        if fingerprint is None:
+            return
+        try:
+            self.store.add(fingerprint, self._vector(question), question, answer)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la respuesta en caché: {e}")
+            with self._lock:
+                self.errors += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.store).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "evictions": self.store.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def create_answer_cache(backend=ANSWER_CACHE_BACKEND):
+    if backend == "none":
+        return None
+    if backend == "redis":
+        return SemanticAnswerCache(RedisAnswerStore())
+    return SemanticAnswerCache(InMemoryAnswerStore())
+
+
+answer_cache = create_answer_cache()
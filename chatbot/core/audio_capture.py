@@ -0,0 +1,263 @@
+"""
+Grabación con detección de voz (VAD) por energía.
+
+El micrófono escribe bloques en un buffer circular desde el callback de
+`sounddevice.InputStream`; el hilo que graba los lee, calcula la energía por
+tramas de 30 ms con NumPy y corta tras VOICE_TRAILING_SILENCE_MS de silencio
+después de haber oído voz, o al llegar a la duración máxima.
+
+La fuente también puede ser un WAV o un array, para probar sin micrófono:
+
+    audio = record_until_silence(source="prueba.wav")
+    audio = record_until_silence(source=np_array)
+"""
+
+import os
+import threading
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+VOICE_CAPTURE_MODE = os.getenv("VOICE_CAPTURE_MODE", "vad")  # vad | fixed
+VOICE_TRAILING_SILENCE_MS = int(os.getenv("VOICE_TRAILING_SILENCE_MS", "700"))
+# Margen sobre el ruido de fondo y umbral mínimo absoluto, en dBFS
+VOICE_VAD_MARGIN_DB = float(os.getenv("VOICE_VAD_MARGIN_DB", "12"))
+VOICE_VAD_MIN_DB = float(os.getenv("VOICE_VAD_MIN_DB", "-50"))
+# Tope del ruido de fondo solo durante los primeros NOISE_SETTLE_MS: si ya se
+# habla al empezar, la estimación mediría la voz y el umbral quedaría por encima
+VOICE_VAD_MAX_NOISE_DB = float(os.getenv("VOICE_VAD_MAX_NOISE_DB", "-50"))
+# Voz mínima para darla por empezada (evita que un clic dispare la grabación)
+MIN_SPEECH_MS = 90
+# Audio que se conserva antes del inicio y después del final de la voz
+PRE_ROLL_MS = 300
+POST_ROLL_MS = 200
+# Ruido de fondo: percentil bajo de la energía en la última ventana. Las pausas
+# entre palabras lo mantienen en el nivel del silencio; en una sala ruidosa sube
+# hasta el ruido real en cuanto termina el periodo inicial con tope
+NOISE_WINDOW_MS = 3000
+NOISE_PERCENTILE = 10
+NOISE_SETTLE_MS = 1000
+
+
+def frame_db(samples, frame_len):
+    """Energía RMS en dBFS de cada trama completa de `samples`."""
+    n_frames = len(samples) // frame_len
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _to_float32(samples):
+    samples = np.asarray(samples)
+    if samples.dtype == np.int16:
+        samples = samples.astype(np.float32) / 32768.0
+    elif samples.dtype == np.int32:
+        samples = samples.astype(np.float32) / 2147483648.0
+    elif samples.dtype == np.uint8:
+        samples = (samples.astype(np.float32) - 128.0) / 128.0
+    samples = samples.astype(np.float32, copy=False)
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def resample(samples, source_rate, target_rate=SAMPLE_RATE):
+    """Remuestreo lineal (suficiente para voz hacia 16 kHz)."""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    duration = len(samples) / source_rate
+    target = np.linspace(0, duration, int(round(duration * target_rate)), endpoint=False)
+    source = np.arange(len(samples)) / source_rate
+    return np.interp(target, source, samples).astype(np.float32)
+
+
+def read_wav(source, fs=SAMPLE_RATE):
+    """WAV PCM (8/16/32 bits, mono o estéreo; ruta o archivo) -> float32 mono a `fs`."""
+    with wave.open(source, "rb") as wav:
+        width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+    samples = np.frombuffer(raw, dtype=dtype).reshape(-1, channels)
+    return resample(_to_float32(samples), rate, fs)
+
+
+def decode_pcm16(raw: bytes, rate=SAMPLE_RATE, fs=SAMPLE_RATE):
+    """PCM 16 bits little-endian mono sin cabecera -> float32 a `fs`."""
+    samples = np.frombuffer(raw[: len(raw) // 2 * 2], dtype="<i2").astype(np.int16)
+    return resample(_to_float32(samples), rate, fs)
+
+
+class RingBuffer:
+    """Buffer circular de un productor (callback de audio) y un consumidor."""
+
+    def __init__(self, capacity):
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._capacity = capacity
+        self._written = 0
+        self._read = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.overruns = 0
+
+    def write(self, block):
+        block = block[-self._capacity :]
+        start = self._written % self._capacity
+        first = min(len(block), self._capacity - start)
+        self._data[start : start + first] = block[:first]
+        self._data[: len(block) - first] = block[first:]
+        with self._cond:
+            self._written += len(block)
+            self._cond.notify()
+
+    def read(self, timeout=1.0):
+        """Devuelve las muestras nuevas (vacío si vence el timeout), o None si se cerró."""
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._written > self._read or self._closed, timeout
+            ):
+                return np.empty(0, dtype=np.float32)
+            if self._written == self._read and self._closed:
+                return None
+            # El consumidor se quedó atrás: se pierde lo más antiguo
+            if self._written - self._read > self._capacity:
+                self.overruns += 1
+                self._read = self._written - self._capacity
+            start, end = self._read, self._written
+            self._read = end
+
+        indices = np.arange(start, end) % self._capacity
+        return self._data[indices]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def _array_blocks(samples, block):
+    for start in range(0, len(samples), block):
+        yield samples[start : start + block]
+
+
+def _microphone_blocks(fs, block, max_samples):
+    import sounddevice as sd
+
+    ring = RingBuffer(max(fs * 2, block * 4))
+
+    def callback(indata, frames, time_info, status):
+        ring.write(indata[:, 0])
+
+    with sd.InputStream(
+        samplerate=fs, channels=1, dtype="float32", blocksize=block, callback=callback
+    ):
+        received = 0
+        while received < max_samples:
+            samples = ring.read(timeout=1.0)
+            if samples is None:
+                break
+            received += len(samples)
+            if len(samples):
+                yield samples
+
+
+def _blocks(source, fs, block, max_samples):
+    if source is None:
+        return _microphone_blocks(fs, block, max_samples)
+    if isinstance(source, (str, os.PathLike)):
+        return _array_blocks(read_wav(source, fs), block)
+    return _array_blocks(_to_float32(source), block)
+
+
+def record_until_silence(
+    source=None,
+    fs=SAMPLE_RATE,
+    max_duration=8.0,
+    trailing_silence_ms=VOICE_TRAILING_SILENCE_MS,
+    margin_db=VOICE_VAD_MARGIN_DB,
+    min_db=VOICE_VAD_MIN_DB,
+    max_noise_db=VOICE_VAD_MAX_NOISE_DB,
+):
+    """
+    Graba hasta que, tras oír voz, haya `trailing_silence_ms` de silencio o se
+    alcance `max_duration` segundos. Devuelve float32 mono a `fs`, recortado a
+    la voz (con un margen); si no hubo voz, lo grabado tal cual.
+    """
+    frame_len = fs * FRAME_MS // 1000
+    max_samples = int(max_duration * fs)
+    silence_frames = max(1, trailing_silence_ms // FRAME_MS)
+    min_speech_frames = max(1, MIN_SPEECH_MS // FRAME_MS)
+    window_frames = max(1, NOISE_WINDOW_MS // FRAME_MS)
+    settle_frames = max(1, NOISE_SETTLE_MS // FRAME_MS)
+
+    audio = np.zeros(max_samples, dtype=np.float32)
+    filled = 0
+    pending = np.empty(0, dtype=np.float32)
+    levels = np.empty(max_samples // frame_len + 1, dtype=np.float32)
+    speech_frames = 0
+    first_speech = last_speech = None
+
+    # Cerrar el generador detiene el InputStream en cuanto se decide parar
+    blocks = _blocks(source, fs, frame_len * 4, max_samples)
+    try:
+        for block in blocks:
+            block = block[: max_samples - filled]
+            audio[filled : filled + len(block)] = block
+            filled += len(block)
+
+            pending = np.concatenate([pending, block])
+            usable = len(pending) // frame_len * frame_len
+            if usable:
+                frame_offset = (filled - len(pending)) // frame_len
+                db = frame_db(pending[:usable], frame_len)
+                pending = pending[usable:]
+
+                levels[frame_offset : frame_offset + len(db)] = db
+                n_levels = frame_offset + len(db)
+                recent = levels[max(0, n_levels - window_frames) : n_levels]
+                noise_db = float(np.percentile(recent, NOISE_PERCENTILE))
+                if n_levels < settle_frames:
+                    noise_db = min(noise_db, max_noise_db)
+                threshold = max(noise_db + margin_db, min_db)
+                speech = db > threshold
+
+                voiced = np.flatnonzero(speech)
+                if len(voiced):
+                    speech_frames += len(voiced)
+                    if first_speech is None:
+                        first_speech = frame_offset + int(voiced[0])
+                    last_speech = frame_offset + int(voiced[-1])
+
+                started = speech_frames >= min_speech_frames
+                current_frame = frame_offset + len(db)
+                if started and current_frame - last_speech - 1 >= silence_frames:
+                    break
+
+            if filled >= max_samples:
+                break
+    finally:
+        blocks.close()
+
+    if first_speech is None or speech_frames < min_speech_frames:
+        return audio[:filled].copy()
+
+    start = max(0, first_speech * frame_len - fs * PRE_ROLL_MS // 1000)
+    end = min(filled, (last_speech + 1) * frame_len + fs * POST_ROLL_MS // 1000)
+    return audio[start:end].copy()
+
+
+def record_fixed(duration=3, fs=SAMPLE_RATE):
+    """Grabación de duración fija (modo anterior, VOICE_CAPTURE_MODE=fixed)."""
+    import sounddevice as sd
+
+    recording = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype="float32")
+    sd.wait()
+    return np.squeeze(recording)
+
+
+def record(max_duration=5, fs=SAMPLE_RATE, source=None):
+    """Punto de entrada común: VAD por defecto, duración fija si así se configura."""
+    if source is None and VOICE_CAPTURE_MODE == "fixed":
+        return record_fixed(max_duration, fs)
+    return record_until_silence(source, fs, max_duration)
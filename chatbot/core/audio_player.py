@@ -0,0 +1,110 @@
+"""
+Reproductor de audio persistente: un único hilo inicializa el mixer de pygame
+una vez y reproduce, en orden, los clips que se le encolan desde memoria.
+
+    player = get_player()
+    player.enqueue(audio)       # mp3 o wav, no bloquea
+    player.wait()               # hasta que termine todo lo encolado
+    player.cancel()             # corta lo que suena y vacía la cola (barge-in)
+"""
+
+import io
+import queue
+import threading
+import time
+
+import pygame
+
+# Cada cuánto el hilo mira si el clip terminó o se pidió cancelar
+POLL_INTERVAL = 0.02
+
+
+class AudioPlayer:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._idle = threading.Condition()
+        self._pending = 0
+        # Los clips encolados antes de un cancel() tienen generación antigua y se descartan
+        self._generation = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audio-player", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, audio: bytes, namehint: str = None):
+        # Los motores TTS devuelven mp3 o wav; se detecta por la cabecera
+        namehint = namehint or ("wav" if audio[:4] == b"RIFF" else "mp3")
+        with self._idle:
+            if self._closed:
+                raise RuntimeError("El reproductor está cerrado")
+            self._pending += 1
+            generation = self._generation
+        self._queue.put((generation, audio, namehint))
+
+    def wait(self, timeout=None):
+        """Bloquea hasta que no quede nada sonando ni en cola. False si vence el timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def cancel(self):
+        with self._idle:
+            self._generation += 1
+
+    def is_busy(self):
+        with self._idle:
+            return self._pending > 0
+
+    def close(self):
+        with self._idle:
+            self._closed = True
+            self._generation += 1
+        self._queue.put(None)
+        self._thread.join()
+
+    def _cancelled(self, generation):
+        with self._idle:
+            return generation != self._generation
+
+    def _done(self):
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def _play(self, generation, audio, namehint):
+        # El archivo en memoria debe vivir mientras pygame lo va leyendo
+        source = io.BytesIO(audio)
+        pygame.mixer.music.load(source, namehint)
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            if self._cancelled(generation):
+                pygame.mixer.music.stop()
+                break
+            time.sleep(POLL_INTERVAL)
+        pygame.mixer.music.unload()
+
+    def _run(self):
+        pygame.mixer.init()
+        try:
+            for item in iter(self._queue.get, None):
+                generation, audio, namehint = item
+                try:
+                    if not self._cancelled(generation):
+                        self._play(generation, audio, namehint)
+                except Exception as e:
+                    print(f"[Error al reproducir] {e}")
+                finally:
+                    self._done()
+        finally:
+            pygame.mixer.quit()
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def get_player():
+    """Reproductor compartido del proceso; el mixer se inicia con el primer uso."""
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = AudioPlayer()
+        return _player
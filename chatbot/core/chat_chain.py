@@ -1,23 +1,104 @@
 
-from chatbot.core.extract_user_info import extract_user_info
-from chatbot.core.langchain_service import rag_chain
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from chatbot.chromadb_utils.retrieval_cache import CachedRetriever
+from chatbot.core.answer_cache import answer_cache
+from chatbot.core.extract_user_info import (aextract_user_info,
+                                            extract_user_info)
+from chatbot.core.langchain_service import rag_chain, retriever
+
+# la extracción de contexto va en paralelo a la respuesta: no depende de ella
+_extract_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="extract")
+
+
+def _extract(user_input, user_context):
+    structured_user_info = extract_user_info(user_input, user_context)
+    print(f"[INFO] User info (paso 2): {structured_user_info}")
+    return structured_user_info
+
+
+def _stream_answer(user_input, user_context):
+    # las preguntas equivalentes con el mismo contexto salen de caché
+    answer = answer_cache.lookup(user_input, user_context) if answer_cache else None
+    if answer is not None:
+        yield answer
+        return
+
+    parts = []
+    for chunk in rag_chain.stream({
+        "input": f"{user_input}",
+        "info": f"{user_context}",
+    }):
+        if chunk.get("answer"):
+            parts.append(chunk["answer"])
+            yield chunk["answer"]
+
+    if answer_cache and parts:
+        answer_cache.store_answer(user_input, user_context, "".join(parts))
+
+
+def stream_chat_flow(user_input, user_context):
+    """
+    Devuelve (generador de fragmentos de la respuesta según los produce
+    Gemini, Future con el contexto nuevo). La extracción corre en paralelo.
+    """
+    extraction = _extract_executor.submit(_extract, user_input, user_context)
+    return _stream_answer(user_input, user_context), extraction
 
 
 # dentro de esta usamos las funcionalidades de langchain y la cadena que nos permite extraer
 # información, dar respuesta y almacenar información (contexto)
 def handle_chat_flow(user_input, user_context):
-    
-    # 2. extraer información del usuario de su pregunta/respuesta
-    structured_user_info = extract_user_info(user_input, user_context)
+    """Versión sin streaming: devuelve (respuesta, contexto nuevo)."""
+    chunks, extraction = stream_chat_flow(user_input, user_context)
+    try:
+        answer = "".join(chunks)
+    except Exception:
+        extraction.cancel()
+        raise
+    return answer, extraction.result()
+
+
+def get_cache_stats():
+    """Aciertos de las cachés del chat (para /health/chat)."""
+    return {
+        "answers": answer_cache.stats() if answer_cache else None,
+        "retrieval": retriever.stats() if isinstance(retriever, CachedRetriever) else None,
+    }
+
+
+# ----- versión asíncrona para el servidor (app/routes/chat_routes.py) -----
+
+
+async def aextract_context(user_input, user_context):
+    structured_user_info = await aextract_user_info(user_input, user_context)
     print(f"[INFO] User info (paso 2): {structured_user_info}")
-    # 3. dar respuesta al usuario
-    result = rag_chain.invoke({
+    return structured_user_info
+
+
+async def astream_answer(user_input, user_context):
+    """Genera los fragmentos de la respuesta según los produce Gemini."""
+    # la caché embebe la pregunta (y puede ir a Redis): fuera del event loop
+    answer = (
+        await asyncio.to_thread(answer_cache.lookup, user_input, user_context)
+        if answer_cache
+        else None
+    )
+    if answer is not None:
+        yield answer
+        return
+
+    parts = []
+    async for chunk in rag_chain.astream({
         "input": f"{user_input}",
         "info": f"{user_context}",
-    })
-   
-    
-    print(f"\n[INFO] Documentos recuperados de la base de datos vectorial: {result["context"]}\n")
-    
-    # 5. retornar la respuesta generada anteiormente
-    return result["answer"], structured_user_info
\ No newline at end of file
+    }):
+        if chunk.get("answer"):
+            parts.append(chunk["answer"])
+            yield chunk["answer"]
+
+    if answer_cache and parts:
+        await asyncio.to_thread(
+            answer_cache.store_answer, user_input, user_context, "".join(parts)
+        )
@@ -33,4 +33,8 @@ extract_chain = extract_prompt | llm | StrOutputParser()
 
 def extract_user_info(user_input, user_history):
     structured_info = extract_chain.invoke({"user_input": user_input, "user_history": user_history})
-    return json.loads(structured_info)
\ No newline at end of file
+    return json.loads(structured_info)
+
+async def aextract_user_info(user_input, user_history):
+    structured_info = await extract_chain.ainvoke({"user_input": user_input, "user_history": user_history})
+    return json.loads(structured_info)
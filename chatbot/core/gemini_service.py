@@ -2,9 +2,18 @@ import os
 
 import google.generativeai as genai
 
+from app.utils.single_flight import SingleFlight
+
 genai.configure(api_key=os.environ.get("GEMINI_API_KEY", ""))
 model = genai.GenerativeModel("models/gemini-2.0-flash")
 
+# El mismo prompt en vuelo se envía una sola vez a Gemini
+llm_flight = SingleFlight("gemini")
+
+
+def generate_content(prompt):
+    return llm_flight.do(prompt, lambda: model.generate_content(prompt))
+
 
 def safe_get_text(response):
     if hasattr(response, "text") and response.text:
@@ -41,7 +50,7 @@ def generate_question(factor_value):
     )
 
     try:
-        response = model.generate_content(prompt)
+        response = generate_content(prompt)
         text = safe_get_text(response).strip().split("\n")[0]
         if not text.endswith("?"):
             text += "?"
@@ -60,7 +69,7 @@ def validate_answer(factor_value, answer):
     )
 
     try:
-        response = model.generate_content(prompt)
+        response = generate_content(prompt)
         result = safe_get_text(response).lower().strip()
         print(f"🔍 Resultado validación: {result}")
         return "sí" in result
@@ -6,6 +6,8 @@ from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from chatbot.chromadb_utils import load_chroma_db_data
+from chatbot.chromadb_utils.retrieval_cache import (RETRIEVAL_CACHE_SIZE,
+                                                    CachedRetriever)
 from chatbot.core.system_prompt_template import prompt
 
 load_dotenv()
@@ -15,8 +17,21 @@ os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
 # modelo a usar
 llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
 
-# cargo los datos de la base de datos
-retriever = load_chroma_db_data.load_vectorstore()
+# cargo los datos de la base de datos (chroma | numpy | hybrid)
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma")
+retriever = load_chroma_db_data.load_retriever(RETRIEVER_BACKEND)
+# las preguntas repetidas no vuelven a embeber ni a buscar (RETRIEVAL_CACHE_SIZE=0 lo desactiva);
+# tras una reingestión los índices en memoria (numpy, hybrid) se vuelven a abrir
+if retriever is not None:
+    retriever = CachedRetriever(
+        retriever=retriever,
+        max_size=RETRIEVAL_CACHE_SIZE,
+        reload=(
+            None
+            if RETRIEVER_BACKEND == "chroma"
+            else lambda: load_chroma_db_data.load_retriever(RETRIEVER_BACKEND)
+        ),
+    )
 
 question_answer_chain = create_stuff_documents_chain(llm, prompt)
 
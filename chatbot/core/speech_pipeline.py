@@ -0,0 +1,94 @@
+"""
+Voz en streaming: la respuesta del LLM se corta en frases según llega, un hilo
+sintetiza cada frase y la encola en el reproductor persistente. Mientras suena
+la frase N se sintetiza la N+1, así que el usuario oye la primera frase sin
+esperar al resto.
+
+    tokens, _ = stream_chat_flow(user_input, user_context)
+    ai_text = speak_stream(tokens)
+"""
+
+import queue
+import re
+import threading
+
+from chatbot.core.audio_player import get_player
+from chatbot.core.tts_engine import synthesize
+
+# Frases más cortas se juntan con la siguiente (evita cortes tipo "Sí." o "1.")
+MIN_SENTENCE_CHARS = 20
+
+_sentence_end_re = re.compile(r"(?<=[.!?…:;])\s+|\n+")
+# Marcas de markdown que Gemini suele devolver y que no se deben leer
+_markdown_re = re.compile(r"[*#_`>]+")
+
+
+def split_sentences(chunks, min_chars=MIN_SENTENCE_CHARS):
+    """Agrupa un flujo de fragmentos de texto en frases completas."""
+    buffer = ""
+    pending = ""
+    for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = _sentence_end_re.split(buffer)
+        for sentence in complete:
+            pending = f"{pending} {sentence}".strip()
+            if len(pending) >= min_chars:
+                yield pending
+                pending = ""
+
+    rest = f"{pending} {buffer}".strip()
+    if rest:
+        yield rest
+
+
+def _speakable(sentence):
+    return " ".join(_markdown_re.sub(" ", sentence).split())
+
+
+def speak_stream(chunks, synthesize_fn=synthesize, player=None):
+    """Habla el texto mientras se genera. Devuelve el texto completo."""
+    player = player or get_player()
+    sentences = queue.Queue()
+    stop = threading.Event()
+
+    def synthesis_worker():
+        for sentence in iter(sentences.get, None):
+            text = _speakable(sentence)
+            if stop.is_set() or not text:
+                continue
+            try:
+                audio = synthesize_fn(text)
+                # Barge-in durante la síntesis: la frase ya no se reproduce
+                if not stop.is_set():
+                    player.enqueue(audio)
+            except Exception as e:
+                print(f"[Error al sintetizar] {e}")
+                print(f"(Mensaje que intentó decir: {text})")
+
+    worker = threading.Thread(target=synthesis_worker, name="tts-synth", daemon=True)
+    worker.start()
+
+    parts = []
+
+    def collect():
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+
+    try:
+        for sentence in split_sentences(collect()):
+            sentences.put(sentence)
+        sentences.put(None)
+        worker.join()
+        player.wait()
+    except BaseException:
+        # Error en la generación o Ctrl+C: se corta la voz (barge-in) y se propaga
+        stop.set()
+        sentences.put(None)
+        player.cancel()
+        # La frase que se estaba sintetizando pudo encolarse antes de ver `stop`
+        worker.join()
+        player.cancel()
+        raise
+
+    return "".join(parts)
@@ -0,0 +1,12 @@
+"""Normalización de texto sin dependencias (la usan el BM25, las cachés y el audio)."""
+
+import unicodedata
+
+
+def fold_accents(text):
+    """Minúsculas y sin tildes, conservando la ñ."""
+    text = text.lower().replace("ñ", "\0")
+    text = "".join(
+        c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn"
+    )
+    return text.replace("\0", "ñ")
@@ -0,0 +1,106 @@
+"""
+Motores de transcripción. Todos exponen `name` y
+`transcribe(audio, language="es") -> str` sobre float32 mono a 16 kHz.
+
+    whisper          openai-whisper en PyTorch (modelos del registro whisper_models)
+    faster-whisper   CTranslate2 con pesos int8 en CPU (opcional: uv sync --extra faster-whisper)
+
+TRANSCRIPTION_ENGINE elige el motor; WHISPER_CPU_THREADS fija los hilos de CPU
+(0 = lo que decida cada librería).
+"""
+
+import importlib.util
+import os
+import threading
+
+import numpy as np
+
+from chatbot.core.whisper_models import (WHISPER_MODEL, get_whisper_model,
+                                         whisper_models)
+
+TRANSCRIPTION_ENGINE = os.getenv("TRANSCRIPTION_ENGINE", "whisper")
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+
+# Aviso al arrancar, no en la primera transcripción: si no, el cambio de motor pasa inadvertido
+if TRANSCRIPTION_ENGINE == "faster-whisper" and importlib.util.find_spec("faster_whisper") is None:
+    print(
+        "⚠️ TRANSCRIPTION_ENGINE=faster-whisper pero el paquete no está instalado "
+        "(uv sync --extra faster-whisper); se usará openai-whisper"
+    )
+
+
+class OpenAIWhisperEngine:
+    name = "whisper"
+
+    def __init__(self, model_size=None, threads=WHISPER_CPU_THREADS):
+        self.model_size = model_size or WHISPER_MODEL
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+
+    def transcribe(self, audio, language="es"):
+        model = get_whisper_model(self.model_size)
+        # El modelo es compartido con el batcher de la API y los códigos de voz
+        with whisper_models.decode_lock(self.model_size):
+            result = model.transcribe(
+                np.asarray(audio, dtype=np.float32),
+                fp16=model.device.type != "cpu",
+                language=language,
+            )
+        return result["text"].strip()
+
+
+class FasterWhisperEngine:
+    name = "faster-whisper"
+
+    def __init__(
+        self,
+        model_size=None,
+        threads=WHISPER_CPU_THREADS,
+        compute_type=FASTER_WHISPER_COMPUTE_TYPE,
+    ):
+        # Falla con ImportError si no está instalado: get_engine avisa y cae a openai-whisper
+        from faster_whisper import WhisperModel
+
+        self.model_size = model_size or WHISPER_MODEL
+        self.model = WhisperModel(
+            self.model_size, device="cpu", compute_type=compute_type, cpu_threads=threads
+        )
+
+    def transcribe(self, audio, language="es"):
+        segments, _ = self.model.transcribe(
+            np.asarray(audio, dtype=np.float32), language=language, beam_size=5
+        )
+        # `segments` es un generador: la decodificación ocurre al recorrerlo
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+ENGINES = {
+    OpenAIWhisperEngine.name: OpenAIWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name=None, model_size=None):
+    """Instancia compartida del motor (una por nombre y tamaño de modelo)."""
+    name = name or TRANSCRIPTION_ENGINE
+    key = (name, model_size or WHISPER_MODEL)
+    with _engines_lock:
+        if key not in _engines:
+            try:
+                _engines[key] = ENGINES[name](model_size)
+            except (ImportError, KeyError) as e:
+                if name == OpenAIWhisperEngine.name:
+                    raise
+                print(f"⚠️ Motor de transcripción '{name}' no disponible ({e}), se usa whisper")
+                _engines[key] = OpenAIWhisperEngine(model_size)
+        return _engines[key]
+
+
+def transcribe(audio, language="es"):
+    return get_engine().transcribe(audio, language)
@@ -0,0 +1,115 @@
+"""
+Motores de síntesis de voz. Todos exponen `name` y `synthesize(text, lang) -> bytes`
+(mp3 o wav; el reproductor detecta el formato).
+
+    gtts      Google Translate TTS, necesita red (por defecto)
+    espeak    espeak-ng / espeak local por línea de comandos, sin red
+    pyttsx3   pyttsx3 (SAPI5 / NSSpeechSynthesizer / espeak), opcional, sin red
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+
+class TTSUnavailableError(RuntimeError):
+    pass
+
+
+class GTTSBackend:
+    name = "gtts"
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakBackend:
+    name = "espeak"
+
+    def __init__(self, voice=None, speed=None):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if self.binary is None:
+            raise TTSUnavailableError("espeak-ng/espeak no está instalado")
+        self.voice = voice or os.getenv("ESPEAK_VOICE")
+        self.speed = speed or os.getenv("ESPEAK_SPEED", "160")
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        # --stdout: el wav sale por la tubería, sin archivos temporales
+        result = subprocess.run(
+            [self.binary, "-v", self.voice or lang, "-s", str(self.speed), "--stdout", text],
+            capture_output=True,
+            check=True,
+            timeout=30,
+        )
+        return result.stdout
+
+
+class Pyttsx3Backend:
+    name = "pyttsx3"
+
+    def __init__(self):
+        try:
+            import pyttsx3
+        except ImportError as e:
+            raise TTSUnavailableError("pyttsx3 no está instalado") from e
+        self._engine = pyttsx3.init()
+        # El motor de pyttsx3 no admite llamadas concurrentes
+        self._lock = threading.Lock()
+        self._voices = {}
+
+    def _voice_for(self, lang):
+        if lang not in self._voices:
+            self._voices[lang] = next(
+                (
+                    voice.id
+                    for voice in self._engine.getProperty("voices")
+                    if lang in str(voice.id).lower()
+                    or any(lang in str(code).lower() for code in (voice.languages or []))
+                ),
+                None,
+            )
+        return self._voices[lang]
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as fp:
+            temp_path = fp.name
+        try:
+            with self._lock:
+                voice = self._voice_for(lang)
+                if voice:
+                    self._engine.setProperty("voice", voice)
+                # pyttsx3 solo sabe escribir a archivo
+                self._engine.save_to_file(text, temp_path)
+                self._engine.runAndWait()
+            with open(temp_path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(temp_path)
+
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+    Pyttsx3Backend.name: Pyttsx3Backend,
+}
+
+
+def create_backends(names):
+    """Instancia los motores disponibles, en orden; avisa de los que no lo están."""
+    backends = []
+    for name in names:
+        if name not in BACKENDS:
+            print(f"⚠️ Motor TTS desconocido: {name}")
+            continue
+        try:
+            backends.append(BACKENDS[name]())
+        except TTSUnavailableError as e:
+            print(f"⚠️ Motor TTS '{name}' no disponible: {e}")
+    return backends
@@ -0,0 +1,142 @@
+"""
+Caché de audio sintetizado, clave (texto, idioma, motor).
+
+Estructura: TTS_CACHE_DIR/<hash>.audio (mp3 o wav según el motor). Acotada
+por tamaño: al superar TTS_CACHE_MAX_BYTES se eliminan los archivos menos
+usados (mtime). Las frases recientes se quedan además en memoria para empezar
+a sonar al instante.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache", "tts"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+TTS_CACHE_MEMORY_ITEMS = int(os.getenv("TTS_CACHE_MEMORY_ITEMS", "64"))
+
+# Frases fijas de la autenticación y el chat; se pre-sintetizan al arrancar.
+# Deben coincidir exactamente con el texto que se pasa a speak().
+FIXED_PHRASES = (
+    "Por favor, diga su código de voz de cuatro dígitos.",
+    "No se detectó un código válido. Intenta de nuevo.",
+    "Código inválido. Intenta nuevamente.",
+    "Perfecto, continuemos.",
+    "Respuesta incorrecta, intenta nuevamente.",
+    "Sesión cerrada correctamente. ¡Hasta pronto!",
+    "Lo siento, tuve un problema para responder.",
+)
+
+
+def tts_cache_key(text, lang, engine):
+    payload = f"{engine}\0{lang}\0{' '.join(text.split())}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    def __init__(
+        self,
+        directory=TTS_CACHE_DIR,
+        max_bytes=TTS_CACHE_MAX_BYTES,
+        memory_items=TTS_CACHE_MEMORY_ITEMS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _remember(self, key, audio):
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, text, lang, engine):
+        key = tts_cache_key(text, lang, engine)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # mtime como marca de último uso para el LRU en disco
+        os.utime(path)
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def put(self, text, lang, engine, audio: bytes):
+        key = tts_cache_key(text, lang, engine)
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._remember(key, audio)
+        self.evict()
+
+    def contains(self, text, lang, engine):
+        return os.path.exists(self._path(tts_cache_key(text, lang, engine)))
+
+    def evict(self):
+        """Si se supera `max_bytes`, elimina los audios usados hace más tiempo."""
+        with self._lock:
+            entries = []
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            for name in names:
+                if not name.endswith(".audio"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), os.path.getsize(path), path))
+                except OSError:
+                    continue
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    def stats(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
+
+
+tts_cache = TTSCache()
@@ -1,28 +1,124 @@
+"""
+Síntesis de voz con varios motores (ver tts_backends) y caché de audio.
+
+TTS_ENGINES fija el orden de preferencia, p. ej. "gtts,espeak". Si un motor
+que no es el último tarda más de TTS_LATENCY_BUDGET segundos o falla, se usa
+el siguiente; tras TTS_FAILURE_THRESHOLD fallos seguidos se salta durante
+TTS_COOLDOWN segundos.
+"""
+
 import os
-import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
-import pygame
-from gtts import gTTS
+from chatbot.core.audio_player import get_player
+from chatbot.core.tts_backends import create_backends
+from chatbot.core.tts_cache import FIXED_PHRASES, tts_cache
 
+TTS_ENGINES = [
+    name.strip() for name in os.getenv("TTS_ENGINES", "gtts,espeak").split(",") if name.strip()
+]
+TTS_LATENCY_BUDGET = float(os.getenv("TTS_LATENCY_BUDGET", "2.5"))
+TTS_FAILURE_THRESHOLD = int(os.getenv("TTS_FAILURE_THRESHOLD", "3"))
+TTS_COOLDOWN = float(os.getenv("TTS_COOLDOWN", "60"))
+
+_backends = None
+_backends_lock = threading.Lock()
+# Los motores lentos siguen terminando aquí después del timeout y su audio se cachea
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts")
+_health = {}
+
+
+def get_backends():
+    global _backends
+    with _backends_lock:
+        if _backends is None:
+            _backends = create_backends(TTS_ENGINES)
+            if not _backends:
+                raise RuntimeError(f"Ningún motor TTS disponible en {TTS_ENGINES}")
+        return _backends
+
+
+def _skipped(name):
+    health = _health.get(name)
+    return bool(health) and time.monotonic() < health["skip_until"]
+
+
+def _record(name, ok):
+    health = _health.setdefault(name, {"failures": 0, "skip_until": 0.0})
+    if ok:
+        health["failures"] = 0
+        return
+    health["failures"] += 1
+    if health["failures"] >= TTS_FAILURE_THRESHOLD:
+        health["skip_until"] = time.monotonic() + TTS_COOLDOWN
+        print(f"⚠️ Motor TTS '{name}' desactivado {TTS_COOLDOWN:.0f}s por fallos seguidos")
 
-def speak(text: str):
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-            temp_path = fp.name
 
-        tts = gTTS(text=text, lang="es", slow=False)
-        tts.save(temp_path)
+def _render(backend, text, lang):
+    audio = backend.synthesize(text, lang)
+    tts_cache.put(text, lang, backend.name, audio)
+    return audio
 
-        pygame.mixer.init()
-        pygame.mixer.music.load(temp_path)
-        pygame.mixer.music.play()
 
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+def synthesize(text: str, lang: str = "es") -> bytes:
+    """Texto -> audio en memoria (mp3 o wav), pasando por la caché de audio."""
+    backends = get_backends()
+    for backend in backends:
+        audio = tts_cache.get(text, lang, backend.name)
+        if audio is not None:
+            return audio
 
-        pygame.mixer.quit()
-        os.remove(temp_path)
+    last_error = None
+    for i, backend in enumerate(backends):
+        is_last = i == len(backends) - 1
+        if not is_last and _skipped(backend.name):
+            continue
+        future = _executor.submit(_render, backend, text, lang)
+        try:
+            audio = future.result(timeout=None if is_last else TTS_LATENCY_BUDGET)
+        except FutureTimeoutError:
+            print(f"[TTS] '{backend.name}' superó {TTS_LATENCY_BUDGET}s, se usa el siguiente motor")
+            _record(backend.name, ok=False)
+            continue
+        except Exception as e:
+            print(f"[TTS] '{backend.name}' falló: {e}")
+            _record(backend.name, ok=False)
+            last_error = e
+            continue
+        _record(backend.name, ok=True)
+        return audio
+
+    raise RuntimeError(f"Ningún motor TTS pudo sintetizar el texto: {last_error}")
+
+
+def warm_up(phrases=FIXED_PHRASES, lang: str = "es"):
+    """Pre-sintetiza en segundo plano las frases fijas que aún no están en caché."""
+
+    def run():
+        for text in phrases:
+            try:
+                synthesize(text, lang)
+            except Exception as e:
+                print(f"[TTS] No se pudo pre-sintetizar '{text}': {e}")
+
+    thread = threading.Thread(target=run, name="tts-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def play(audio: bytes):
+    """Reproduce un clip y espera a que termine."""
+    player = get_player()
+    player.enqueue(audio)
+    player.wait()
+
+
+def speak(text: str):
+    try:
+        play(synthesize(text))
 
     except Exception as e:
         print(f"[Error al hablar] {e}")
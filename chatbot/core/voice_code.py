@@ -0,0 +1,136 @@
+"""
+Reconocimiento rápido de códigos de voz de 4 dígitos.
+
+Ruta rápida: modelo pequeño (VOICE_CODE_MODEL, "tiny" por defecto) con el
+vocabulario restringido a cifras y a los nombres de los dígitos en español,
+pocas muestras y parada en cuanto se han oído los cuatro dígitos. Si no salen
+exactamente cuatro, se repite con la transcripción completa del modelo normal.
+"""
+
+import os
+import re
+
+import numpy as np
+
+from chatbot.core.text_utils import fold_accents
+from chatbot.core.transcription_engines import transcribe
+from chatbot.core.whisper_models import get_whisper_model, whisper_models
+
+VOICE_CODE_MODEL = os.getenv("VOICE_CODE_MODEL", "tiny")
+VOICE_CODE_LENGTH = 4
+# Tokens como máximo: cuatro palabras de hasta tres tokens y separadores
+VOICE_CODE_SAMPLE_LEN = 24
+
+DIGIT_WORDS = {
+    "cero": "0",
+    "uno": "1",
+    "un": "1",
+    "una": "1",
+    "dos": "2",
+    "tres": "3",
+    "cuatro": "4",
+    "cinco": "5",
+    "seis": "6",
+    "siete": "7",
+    "ocho": "8",
+    "nueve": "9",
+}
+_token_re = re.compile(r"[a-zñ]+|\d")
+
+_allowed_cache = {}
+
+
+def parse_digits(text):
+    """'Uno, 2 tres-cuatro' -> '1234'. Ignora todo lo que no sea un dígito."""
+    digits = []
+    for token in _token_re.findall(fold_accents(text)):
+        if token.isdigit():
+            digits.append(token)
+        elif token in DIGIT_WORDS:
+            digits.append(DIGIT_WORDS[token])
+    return "".join(digits)
+
+
+def _allowed_tokens(tokenizer):
+    """Ids de tokens de texto que pueden formar cifras o nombres de dígitos."""
+    key = (tokenizer.encoding.name, tokenizer.language)
+    if key not in _allowed_cache:
+        variants = [str(d) for d in range(10)] + list(DIGIT_WORDS) + [",", ".", "-"]
+        allowed = set()
+        for word in variants:
+            for form in (word, word.capitalize()):
+                allowed.update(tokenizer.encode(form))
+                allowed.update(tokenizer.encode(f" {form}"))
+        _allowed_cache[key] = allowed
+    return _allowed_cache[key]
+
+
+class _StopAfterDigits:
+    """Filtro de logits de Whisper: fuerza fin de texto al completar el código."""
+
+    def __init__(self, tokenizer, sample_begin, length):
+        self.tokenizer = tokenizer
+        self.sample_begin = sample_begin
+        self.length = length
+
+    def apply(self, logits, tokens):
+        eot = self.tokenizer.eot
+        for row, sampled in enumerate(tokens[:, self.sample_begin :].tolist()):
+            text = self.tokenizer.decode([t for t in sampled if t < eot])
+            if len(parse_digits(text)) >= self.length:
+                logits[row, :eot] = -np.inf
+                logits[row, eot + 1 :] = -np.inf
+
+
+def decode_code_fast(audio, length=VOICE_CODE_LENGTH, model_size=None):
+    """Decodificación restringida a dígitos con el modelo pequeño. Devuelve el texto."""
+    import whisper
+    from whisper.decoding import DecodingTask
+
+    model_size = model_size or VOICE_CODE_MODEL
+    model = get_whisper_model(model_size)
+    mel = whisper.log_mel_spectrogram(
+        whisper.pad_or_trim(np.asarray(audio, dtype=np.float32)),
+        model.dims.n_mels,
+        device=model.device,
+    )
+
+    tokenizer = whisper.tokenizer.get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language="es",
+        task="transcribe",
+    )
+    allowed = _allowed_tokens(tokenizer)
+    options = whisper.DecodingOptions(
+        language="es",
+        without_timestamps=True,
+        sample_len=VOICE_CODE_SAMPLE_LEN,
+        suppress_tokens=[t for t in range(tokenizer.eot) if t not in allowed],
+        fp16=model.device.type != "cpu",
+    )
+    with whisper_models.decode_lock(model_size):
+        task = DecodingTask(model, options)
+        task.logit_filters.append(_StopAfterDigits(tokenizer, task.sample_begin, length))
+        return task.run(mel.unsqueeze(0))[0].text
+
+
+def decode_code_full(audio):
+    """Transcripción completa con el motor por defecto (ruta anterior)."""
+    return transcribe(audio)
+
+
+def recognize_code(audio, length=VOICE_CODE_LENGTH):
+    """
+    Devuelve (código o None, ruta usada: "fast" | "full"). Solo se acepta un
+    resultado con exactamente `length` dígitos.
+    """
+    try:
+        code = parse_digits(decode_code_fast(audio, length))
+        if len(code) == length:
+            return code, "fast"
+    except Exception as e:
+        print(f"⚠️ Falló el reconocimiento rápido del código: {e}")
+
+    code = parse_digits(decode_code_full(audio))
+    return (code if len(code) == length else None), "full"
@@ -1,16 +1,92 @@
+import os
+import threading
+
 import numpy as np
-import sounddevice as sd
-import whisper
 
-whisper_model = whisper.load_model("base")
+from chatbot.core.audio_capture import SAMPLE_RATE, frame_db, record, resample
+from chatbot.core.transcription_engines import transcribe
+
+AUDIO_NORMALIZE = os.getenv("AUDIO_NORMALIZE", "peak")  # peak | rms | none
+# Tramas por debajo de (máximo - TRIM_RANGE_DB) o de SILENCE_DB se consideran silencio
+TRIM_RANGE_DB = 40.0
+SILENCE_DB = -60.0
+TRIM_FRAME_MS = 20
+TRIM_PADDING_MS = 150
+PEAK_TARGET = 0.9
+RMS_TARGET_DB = -20.0
+# Ganancia máxima: no convertir ruido de fondo en "voz"
+MAX_GAIN = 20.0
+
+_stats = {"calls": 0, "input_s": 0.0, "output_s": 0.0}
+_stats_lock = threading.Lock()
+
+
+def preprocess_audio(audio, fs=SAMPLE_RATE, target_fs=SAMPLE_RATE, normalize=AUDIO_NORMALIZE):
+    """
+    Quita la componente continua, recorta el silencio inicial y final,
+    normaliza el nivel (pico o RMS) y remuestrea a `target_fs`.
+    Devuelve (audio float32, {"input_s", "output_s"}); si todo es silencio,
+    el audio devuelto está vacío.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    input_s = len(audio) / fs
+
+    audio = resample(audio, fs, target_fs)
+    audio = audio - audio.mean() if len(audio) else audio
+
+    frame_len = target_fs * TRIM_FRAME_MS // 1000
+    db = frame_db(audio, frame_len) if len(audio) >= frame_len else np.empty(0)
+    if len(db) == 0 or db.max() < SILENCE_DB:
+        audio = audio[:0]
+    else:
+        voiced = np.flatnonzero(db >= max(db.max() - TRIM_RANGE_DB, SILENCE_DB))
+        padding = target_fs * TRIM_PADDING_MS // 1000
+        start = max(0, voiced[0] * frame_len - padding)
+        end = min(len(audio), (voiced[-1] + 1) * frame_len + padding)
+        audio = audio[start:end]
+
+        if normalize == "peak":
+            peak = float(np.abs(audio).max())
+            audio = audio * min(PEAK_TARGET / peak, MAX_GAIN) if peak > 0 else audio
+        elif normalize == "rms":
+            rms = float(np.sqrt(np.mean(np.square(audio))))
+            gain = 10 ** (RMS_TARGET_DB / 20) / rms if rms > 0 else 1.0
+            audio = np.clip(audio * min(gain, MAX_GAIN), -1.0, 1.0)
+
+    output_s = len(audio) / target_fs
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["input_s"] += input_s
+        _stats["output_s"] += output_s
+    return audio.astype(np.float32, copy=False), {
+        "input_s": round(input_s, 2),
+        "output_s": round(output_s, 2),
+    }
+
+
+def get_preprocess_stats():
+    """Segundos de audio antes y después del recorte (lo que Whisper ya no decodifica)."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["trimmed_ratio"] = (
+        round(1 - stats["output_s"] / stats["input_s"], 3) if stats["input_s"] else 0.0
+    )
+    stats["input_s"] = round(stats["input_s"], 1)
+    stats["output_s"] = round(stats["output_s"], 1)
+    return stats
 
 
-def record_audio(duration=3, fs=16000):
-    recording = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype="float32")
-    sd.wait()
-    return np.squeeze(recording)
+def record_audio(duration=3, fs=16000, source=None):
+    """Graba hasta que el usuario deja de hablar (como máximo `duration` segundos)."""
+    return record(duration, fs, source)
 
 
 def transcribe_audio(audio):
-    result = whisper_model.transcribe(audio, fp16=False)
-    return result["text"].strip()
+    audio, info = preprocess_audio(audio)
+    print(f"🎚️ Audio: {info['input_s']} s -> {info['output_s']} s tras el preprocesado")
+    if len(audio) == 0:
+        return ""
+    # Motor según TRANSCRIPTION_ENGINE (openai-whisper o faster-whisper int8)
+    return transcribe(audio)
@@ -0,0 +1,133 @@
+"""
+Registro de modelos Whisper compartido por todo el proceso.
+
+Un modelo por (tamaño, dispositivo), cargado la primera vez que se pide o en un
+hilo de precarga. Ni la API ni el chat pagan la carga al importar, y aunque se
+usen whisper_engine y whisper_utils a la vez solo hay una copia de los pesos.
+
+    model = get_whisper_model()            # WHISPER_MODEL, dispositivo automático
+    model = get_whisper_model("tiny")
+    whisper_models.warm_up()               # en segundo plano
+
+Los hooks de caché KV de whisper se instalan sobre los módulos del modelo, así
+que dos decodificaciones simultáneas del mismo modelo se pisan: cada una debe
+hacerse dentro de `decode_lock` (batcher, motor whisper, códigos de voz).
+
+    with whisper_models.decode_lock("tiny"):
+        ...
+"""
+
+import os
+import threading
+import time
+
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")  # tiny/base/small/medium/large
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE") or None  # cpu | cuda; vacío = automático
+
+
+def _resolve_device(device):
+    if device:
+        return device
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _rss_bytes():
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+class WhisperRegistry:
+    def __init__(self):
+        self._models = {}
+        self._metrics = {}
+        self._locks = {}
+        self._decode_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(size, device):
+        return (size or WHISPER_MODEL, _resolve_device(device or WHISPER_DEVICE))
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def decode_lock(self, size=None, device=None):
+        """Lock del modelo (tamaño, dispositivo): una decodificación a la vez."""
+        key = self._key(size, device)
+        with self._lock:
+            return self._decode_locks.setdefault(key, threading.Lock())
+
+    def get(self, size=None, device=None):
+        key = self._key(size, device)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        # Un lock por modelo: peticiones simultáneas esperan a una sola carga
+        with self._key_lock(key):
+            if key not in self._models:
+                self._models[key] = self._load(*key)
+            return self._models[key]
+
+    def _load(self, size, device):
+        import whisper
+
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        model = whisper.load_model(size, device=device)
+        elapsed = time.perf_counter() - started
+        rss_after = _rss_bytes()
+
+        self._metrics[(size, device)] = {
+            "load_seconds": round(elapsed, 2),
+            "parameters": sum(p.numel() for p in model.parameters()),
+            "weights_mb": round(
+                sum(p.numel() * p.element_size() for p in model.parameters()) / 1e6, 1
+            ),
+            "rss_delta_mb": (
+                round((rss_after - rss_before) / 1e6, 1)
+                if rss_before is not None and rss_after is not None
+                else None
+            ),
+        }
+        print(f"🎙️ Whisper '{size}' cargado en {device} ({elapsed:.1f}s)")
+        return model
+
+    def warm_up(self, size=None, device=None):
+        """Carga el modelo en un hilo para que la primera petición no espere."""
+
+        def run():
+            try:
+                self.get(size, device)
+            except Exception as e:
+                print(f"❌ No se pudo precargar Whisper: {e}")
+
+        thread = threading.Thread(target=run, name="whisper-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def is_loaded(self, size=None, device=None):
+        return self._key(size, device) in self._models
+
+    def stats(self):
+        return {
+            "loaded": [f"{size}@{device}" for size, device in self._models],
+            "models": {
+                f"{size}@{device}": metrics
+                for (size, device), metrics in self._metrics.items()
+            },
+        }
+
+
+whisper_models = WhisperRegistry()
+
+
+def get_whisper_model(size=None, device=None):
+    return whisper_models.get(size, device)
@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from app.utils.report_cache import report_cache
 from chatbot.db.database import SessionLocal
 from chatbot.db.models import User
 
@@ -44,6 +45,10 @@ class UserRepository:
             
             self.db.commit()
             self.db.refresh(user)
+
+            # Un contexto nuevo deja obsoletos los informes generados
+            if "context" in kwargs:
+                report_cache.invalidate_user(user_id)
             return user
         return None
     
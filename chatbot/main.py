@@ -6,9 +6,15 @@ load_dotenv()
 from chatbot.auth.authentication import authenticate_user
 from chatbot.chat.chat_loop import chat_loop
 from chatbot.core.redis_client import delete_session, get_session, session_ttl
+from chatbot.core.tts_engine import warm_up
+from chatbot.core.whisper_models import whisper_models
 from chatbot.db.cursor import get_cursor
 
 if __name__ == "__main__":
+    # Las frases fijas y Whisper se cargan mientras se consulta la sesión
+    warm_up()
+    whisper_models.warm_up()
+
     user_id = get_session()
 
     if user_id:
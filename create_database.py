@@ -1,30 +1,62 @@
+import argparse
 import os
 import shutil
 
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import DirectoryLoader
-from langchain_community.embeddings import \
-    HuggingFaceEmbeddings  # Cambia esta línea
+from langchain_community.document_loaders import UnstructuredMarkdownLoader
 from langchain_community.vectorstores import Chroma
 
+from chatbot.chromadb_utils.embedding_cache import \
+    get_embeddings as get_cached_embeddings
+from chatbot.chromadb_utils.ingest_manifest import (IngestManifest,
+                                                    file_sha256, find_files,
+                                                    remove_file, sync_file)
+
 CHROMA_PATH = "chroma"
 DATA_PATH = "data/books"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SETTINGS = {"embedding_model": EMBEDDING_MODEL, "chunk_size": 300, "chunk_overlap": 80}
 
 
 def main():
-    generate_data_store()
-
-
-def generate_data_store():
-    documents = load_documents()
-    chunks = split_text(documents)
-    save_to_chroma(chunks)
-
-
-def load_documents():
-    loader = DirectoryLoader(DATA_PATH, glob="*.md")
-    documents = loader.load()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--full", action="store_true", help="Regenera la base desde cero"
+    )
+    args = parser.parse_args()
+    generate_data_store(full=args.full)
+
+
+def generate_data_store(full=False):
+    files = find_files(DATA_PATH, (".md",))
+    manifest = IngestManifest.load(CHROMA_PATH, SETTINGS)
+    untracked = os.path.exists(CHROMA_PATH) and not os.path.exists(manifest.path)
+
+    if full or manifest.outdated or untracked:
+        documents = load_documents(files.values())
+        chunks = split_text(documents)
+        save_to_chroma(chunks, files)
+        return
+
+    changed, removed = manifest.plan(files)
+    if not changed and not removed:
+        print(f"{CHROMA_PATH} ya está al día.")
+        return
+
+    db = Chroma(persist_directory=CHROMA_PATH, embedding_function=get_embeddings())
+    for rel_path in removed:
+        remove_file(db, manifest, rel_path)
+    for rel_path, sha in changed.items():
+        chunks = split_text(load_documents([files[rel_path]]))
+        added, deleted = sync_file(db, manifest, rel_path, sha, chunks)
+        print(f"{rel_path}: {added} chunks nuevos, {deleted} eliminados.")
+
+
+def load_documents(paths):
+    documents = []
+    for path in paths:
+        documents.extend(UnstructuredMarkdownLoader(path).load())
     return documents
 
 
@@ -45,16 +77,23 @@ def split_text(documents: list[Document]):
     return chunks
 
 
-def save_to_chroma(chunks: list[Document]):
+def get_embeddings():
+    # USAR EMBEDDINGS LOCALES - sin API (con caché en disco)
+    return get_cached_embeddings(EMBEDDING_MODEL)
+
+
+def save_to_chroma(chunks: list[Document], files: dict):
     if os.path.exists(CHROMA_PATH):
         shutil.rmtree(CHROMA_PATH)
 
-    # USAR EMBEDDINGS LOCALES - sin API
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+    db = Chroma(persist_directory=CHROMA_PATH, embedding_function=get_embeddings())
+    manifest = IngestManifest(CHROMA_PATH, SETTINGS)
+
+    # Se registran los chunks por archivo para permitir actualizaciones incrementales
+    for rel_path, abs_path in files.items():
+        file_chunks = [c for c in chunks if c.metadata.get("source") == abs_path]
+        sync_file(db, manifest, rel_path, file_sha256(abs_path), file_chunks)
 
-    db = Chroma.from_documents(chunks, embeddings, persist_directory=CHROMA_PATH)
     db.persist()
     print(f"Saved {len(chunks)} chunks to {CHROMA_PATH}.")
 
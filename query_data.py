@@ -5,9 +5,10 @@ import warnings
 import google.generativeai as genai
 from dotenv import load_dotenv
 from langchain.prompts import ChatPromptTemplate
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 
+from chatbot.chromadb_utils.embedding_cache import get_embeddings
+
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 # Load environment variables
@@ -38,10 +39,8 @@ def main():
     args = parser.parse_args()
     query_text = args.query_text
 
-    # Embeddings locales
-    embedding_function = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+    # Embeddings locales (las consultas repetidas salen de la caché)
+    embedding_function = get_embeddings("sentence-transformers/all-MiniLM-L6-v2")
 
     db = Chroma(persist_directory=CHROMA_PATH, embedding_function=embedding_function)
 